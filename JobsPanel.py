@@ -0,0 +1,81 @@
+from typing import Dict, List
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView, QSpinBox)
+from PyQt6.QtCore import pyqtSignal
+
+from ModernWidgets import ModernButton, ModernProgressBar
+
+class JobsPanel(QWidget):
+    """One row per source directory of a multi-directory run.
+
+    Weights can be changed while the jobs run; they set each job's share of
+    the provider rate budget.
+    """
+    HEADERS = ["Folder", "Weight", "Progress", "Status", ""]
+    cancel_requested = pyqtSignal(int)
+    weight_changed = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column, width in ((1, 70), (2, 140), (3, 90), (4, 90)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Fixed)
+            header.resizeSection(column, width)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                border: 1px solid #E5E5EA;
+                border-radius: 8px;
+                gridline-color: #F2F2F7;
+                font-size: 13px;
+            }
+        """)
+        layout.addWidget(self.table)
+        self.progress_bars: List[ModernProgressBar] = []
+        self.cancel_buttons: List[ModernButton] = []
+
+    def set_jobs(self, jobs: List[Dict]):
+        """Show one row per job snapshot (see Job.snapshot)."""
+        self.table.setRowCount(len(jobs))
+        self.progress_bars, self.cancel_buttons = [], []
+        for row, job in enumerate(jobs):
+            self.table.setItem(row, 0, QTableWidgetItem(job["source_dir"]))
+
+            weight = QSpinBox()
+            weight.setRange(1, 10)
+            weight.setValue(int(job["weight"]))
+            weight.valueChanged.connect(lambda value, job_id=job["id"]: self.weight_changed.emit(job_id, value))
+            self.table.setCellWidget(row, 1, weight)
+
+            progress = ModernProgressBar()
+            self.table.setCellWidget(row, 2, progress)
+            self.progress_bars.append(progress)
+
+            cancel = ModernButton("Cancel")
+            cancel.clicked.connect(lambda _, job_id=job["id"]: self.cancel_requested.emit(job_id))
+            self.table.setCellWidget(row, 4, cancel)
+            self.cancel_buttons.append(cancel)
+            self.update_job(job)
+
+    def update_job(self, job: Dict):
+        row = job["id"]
+        self.progress_bars[row].setValue(job["progress"])
+        status = job["status"].capitalize()
+        if job["status"] == "running":
+            status = f"{job['processed']} files"
+        self.table.setItem(row, 3, QTableWidgetItem(status))
+        if job["error"]:
+            self.table.item(row, 3).setToolTip(job["error"])
+        self.cancel_buttons[row].setEnabled(job["status"] in ("queued", "running"))
+
+    def clear(self):
+        self.table.setRowCount(0)
+        self.progress_bars, self.cancel_buttons = [], []
@@ -10,12 +10,15 @@ class PrivacyDialog(QMessageBox):
 How This App Protects Your Privacy:
 
 1. File Analysis
-   • Only reads file names, creation dates, and file types
-   • Never scans or reads the contents of your files
+   • Reads file names, creation dates, and file types
+   • Only reads the contents of your files if "Detect file types and
+     duplicates from file contents" is turned on, and then only on your
+     computer
    • No file content is ever uploaded or transmitted
 
 2. AI Integration
-   • Only sends file metadata (names, types) to AI services
+   • Only sends file metadata (names, types) to AI services; with content
+     detection on, the type may be one detected from the file's contents
    • Uses this information to determine appropriate categories
    • File contents remain completely private on your device
 
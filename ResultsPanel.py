@@ -0,0 +1,311 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
+                             QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from ModernWidgets import ModernComboBox
+
+ALL = "All"
+
+class _Interned:
+    """Maps repeated strings (categories, sources) to small ints stored in arrays."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def id(self, value: str) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+class ResultsTableModel(QAbstractTableModel):
+    """Per-file results of a run, stored column-wise in arrays.
+
+    Rows are appended in batches from a timer, and sorting/filtering work on an
+    index array instead of a proxy model, so memory stays flat at 500k rows.
+    """
+    HEADERS = ["File", "Category", "Source", "Status"]
+    FLUSH_INTERVAL_MS = 100
+    # Emitted after every non-empty flush, even when the filter hides all new rows
+    batch_added = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._reset_rows()
+        self.filters = {"category": None, "source": None, "errors_only": None}
+        self.sort_column = None
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+
+    def add_result(self, result: Dict):
+        """Queue a result; it is shown on the next flush."""
+        self.pending.append(result)
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        first_new = len(self.names)
+        for result in batch:
+            row = len(self.names)
+            self.names.append(result["name"])
+            self.categories.append(self.category_names.id(result.get("category") or "-"))
+            self.sources.append(self.source_names.id(result.get("source") or "-"))
+            self.failed.append(1 if result.get("error") else 0)
+            if result.get("error"):
+                self.errors[row] = result["error"]
+
+        visible = array("I", (row for row in range(first_new, len(self.names)) if self._accepts(row)))
+        if visible and self.sort_column is None:
+            start = len(self.view)
+            self.beginInsertRows(QModelIndex(), start, start + len(visible) - 1)
+            self.view.extend(visible)
+            self.endInsertRows()
+        elif visible:
+            self._merge_sorted(visible)
+        self.batch_added.emit()
+
+    def _merge_sorted(self, rows: array):
+        """Merge new rows into the sorted view in one pass and one layout change.
+
+        Equal keys keep arrival order, as with a stable sort of the whole view.
+        """
+        key = self._sort_key(self.sort_column)
+        rows = sorted(rows, key=key, reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        # Positions in the current view; non-decreasing because rows are sorted
+        positions = [self._insert_position(key, key(row)) for row in rows]
+
+        self.layoutAboutToBeChanged.emit()
+        merged = array("I")
+        start = 0
+        for position, row in zip(positions, rows):
+            merged.extend(self.view[start:position])
+            merged.append(row)
+            start = position
+        merged.extend(self.view[start:])
+        self.view = merged
+        # A shown row moves down by the number of new rows placed before it
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self.index(index.row() + bisect_right(positions, index.row()), index.column())
+            for index in persistent])
+        self.layoutChanged.emit()
+
+    def _insert_position(self, key, row_key) -> int:
+        """bisect_right on the sorted view (bisect only takes key= from Python 3.10)."""
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        lo, hi = 0, len(self.view)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = key(self.view[mid])
+            if (row_key > other) if descending else (row_key < other):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def clear(self):
+        self.beginResetModel()
+        self._reset_rows()
+        self.filters = {"category": None, "source": None, "errors_only": None}
+        self.endResetModel()
+
+    def _reset_rows(self):
+        self.names: List[str] = []
+        self.categories = array("H")
+        self.sources = array("B")
+        self.failed = array("B")
+        self.errors: Dict[int, str] = {}
+        self.category_names = _Interned()
+        self.source_names = _Interned()
+        self.pending: List[Dict] = []
+        # Row indices currently shown, in display order
+        self.view = array("I")
+
+    def _accepts(self, row: int) -> bool:
+        category, source, errors_only = self.filters["category"], self.filters["source"], self.filters["errors_only"]
+        if category is not None and self.categories[row] != category:
+            return False
+        if source is not None and self.sources[row] != source:
+            return False
+        if errors_only is not None and self.failed[row] != errors_only:
+            return False
+        return True
+
+    def set_filter(self, category: Optional[str] = None, source: Optional[str] = None,
+                   errors_only: Optional[bool] = None):
+        """Show only rows matching the given category, source and error state (None = any)."""
+        self.filters = {
+            "category": self.category_names.ids.get(category, -1) if category else None,
+            "source": self.source_names.ids.get(source, -1) if source else None,
+            "errors_only": int(errors_only) if errors_only is not None else None,
+        }
+        self._rebuild_view()
+
+    def _rebuild_view(self):
+        self.beginResetModel()
+        self.view = array("I", (row for row in range(len(self.names)) if self._accepts(row)))
+        if self.sort_column is not None:
+            self._sort_view()
+        self.endResetModel()
+
+    def _sort_key(self, column: int):
+        if column == 0:
+            return self.names.__getitem__
+        if column == 1:
+            names = self.category_names.values
+            return lambda row: names[self.categories[row]]
+        if column == 2:
+            names = self.source_names.values
+            return lambda row: names[self.sources[row]]
+        return self.failed.__getitem__
+
+    def _sort_view(self):
+        reverse = self.sort_order == Qt.SortOrder.DescendingOrder
+        self.view = array("I", sorted(self.view, key=self._sort_key(self.sort_column), reverse=reverse))
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        # Column -1 (no sort indicator) shows rows in the order they arrived
+        self.sort_column = column if column >= 0 else None
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        if self.sort_column is None:
+            self.view = array("I", sorted(self.view))
+        else:
+            self._sort_view()
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.view[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return self.names[row]
+            if column == 1:
+                return self.category_names.values[self.categories[row]]
+            if column == 2:
+                return self.source_names.values[self.sources[row]]
+            return "Error" if self.failed[row] else "OK"
+        if role == Qt.ItemDataRole.ToolTipRole and self.failed[row]:
+            return self.errors.get(row)
+        if role == Qt.ItemDataRole.ForegroundRole and column == 3 and self.failed[row]:
+            return QColor("#FF3B30")
+        return None
+
+class ResultsPanel(QWidget):
+    """Live, filterable table of what happened to each file in the current run."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = ResultsTableModel(self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
+        filter_layout = QHBoxLayout()
+        self.category_combo = ModernComboBox()
+        self.source_combo = ModernComboBox()
+        self.state_combo = ModernComboBox()
+        self.category_combo.addItem(ALL)
+        self.source_combo.addItem(ALL)
+        self.state_combo.addItems([ALL, "OK", "Errors"])
+        for label, combo in (("Category:", self.category_combo),
+                             ("Source:", self.source_combo),
+                             ("Status:", self.state_combo)):
+            combo.setMinimumWidth(120)
+            combo.currentIndexChanged.connect(self.apply_filter)
+            filter_layout.addWidget(QLabel(label))
+            filter_layout.addWidget(combo)
+        filter_layout.addStretch()
+        self.count_label = QLabel("0 files")
+        self.count_label.setStyleSheet("color: #8E8E93; font-size: 13px;")
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # Qt's default indicator would sort by file name, descending; start in
+        # processing order until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # Fixed row heights keep the view from measuring every row
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(ResultsTableModel.HEADERS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.Fixed)
+            header.resizeSection(column, 110)
+        self.table.setStyleSheet("""
+            QTableView {
+                border: 1px solid #E5E5EA;
+                border-radius: 8px;
+                gridline-color: #F2F2F7;
+                font-size: 13px;
+            }
+        """)
+        layout.addWidget(self.table)
+
+        self.model.batch_added.connect(self.update_filters)
+        self.model.modelReset.connect(self.update_count)
+
+    def add_result(self, result: dict):
+        self.model.add_result(result)
+
+    def clear(self):
+        self.model.clear()
+        for combo in (self.category_combo, self.source_combo):
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(ALL)
+            combo.blockSignals(False)
+        self.state_combo.setCurrentIndex(0)
+        self.update_count()
+
+    def update_filters(self):
+        """Offer every category and source seen so far in the filter boxes."""
+        for combo, interned in ((self.category_combo, self.model.category_names),
+                                (self.source_combo, self.model.source_names)):
+            for value in interned.values[combo.count() - 1:]:
+                combo.addItem(value)
+        self.update_count()
+
+    def update_count(self):
+        shown, total = self.model.rowCount(), len(self.model.names)
+        self.count_label.setText(f"{total} files" if shown == total else f"{shown} of {total} files")
+
+    def apply_filter(self):
+        category = self.category_combo.currentText()
+        source = self.source_combo.currentText()
+        state = self.state_combo.currentText()
+        self.model.set_filter(
+            category=None if category == ALL else category,
+            source=None if source == ALL else source,
+            errors_only=None if state == ALL else state == "Errors"
+        )
@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QSettings
 
 from ModernWidgets import ModernComboBox, ModernLineEdit  # Assuming these are custom widgets
+from layout import LayoutPolicy
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -148,21 +149,104 @@ class SettingsDialog(QDialog):
             self.settings.value("keep_structure", False, type=bool)
         )
         
+        self.recursive = QCheckBox("Include subfolders")
+        self.recursive.setChecked(
+            self.settings.value("recursive", False, type=bool)
+        )
+
+        self.skip_hidden = QCheckBox("Skip hidden and system files")
+        self.skip_hidden.setChecked(
+            self.settings.value("skip_hidden", True, type=bool)
+        )
+        
         rules_layout.addWidget(self.create_backup)
         rules_layout.addWidget(self.keep_structure)
+        self.network_mode = QCheckBox("Network drive mode (SMB/NFS)")
+        self.network_mode.setChecked(
+            self.settings.value("network_mode", False, type=bool)
+        )
+
+        rules_layout.addWidget(self.recursive)
+        rules_layout.addWidget(self.skip_hidden)
+        rules_layout.addWidget(self.network_mode)
+
+        self.keep_unsorted = QCheckBox("Leave files that fit no category in place")
+        self.keep_unsorted.setChecked(
+            self.settings.value("keep_unsorted", False, type=bool)
+        )
+        rules_layout.addWidget(self.keep_unsorted)
+
+        # Reads file headers on this computer only; nothing but the detected type is sent
+        self.analyze_contents = QCheckBox("Detect file types and duplicates from file contents")
+        self.analyze_contents.setChecked(
+            self.settings.value("analyze_contents", False, type=bool)
+        )
+        rules_layout.addWidget(self.analyze_contents)
         
         # File exclusions
         self.excluded_types = ModernLineEdit()
-        self.excluded_types.setPlaceholderText("e.g. .tmp, .log")
+        self.excluded_types.setPlaceholderText("e.g. .tmp, .log, ~$*, cache/*, re:^draft")
         self.excluded_types.setText(
             self.settings.value("excluded_types", "")
         )
         
         rules_layout.addWidget(QLabel("Excluded file types:"))
         rules_layout.addWidget(self.excluded_types)
+
+        # Layout of large categories
+        self.layout_scheme = ModernComboBox()
+        self.layout_scheme.addItems(["Flat", "Hash subfolders", "Year/Month subfolders"])
+        self.layout_scheme.setCurrentIndex(
+            self.settings.value("layout_scheme", 0, type=int)
+        )
+
+        self.layout_max_entries = QSpinBox()
+        self.layout_max_entries.setRange(LayoutPolicy.MIN_ENTRIES, 1000000)
+        self.layout_max_entries.setSingleStep(1000)
+        self.layout_max_entries.setValue(
+            self.settings.value("layout_max_entries", 10000, type=int)
+        )
+        self.layout_max_entries.setSuffix(" files")
+
+        self.priority = ModernComboBox()
+        self.priority.addItems(["Folder order", "Newest first", "Largest first",
+                                "Smallest first", "Documents first"])
+        self.priority.setCurrentIndex(
+            self.settings.value("priority", 0, type=int)
+        )
+
+        rules_layout.addWidget(QLabel("Process files:"))
+        rules_layout.addWidget(self.priority)
+        rules_layout.addWidget(QLabel("Category folder layout:"))
+        rules_layout.addWidget(self.layout_scheme)
+        rules_layout.addWidget(QLabel("Split folders larger than:"))
+        rules_layout.addWidget(self.layout_max_entries)
         
         rules_group.setLayout(rules_layout)
         layout.addWidget(rules_group)
+
+        # Model cascade
+        cascade_group = QGroupBox("AI Models")
+        cascade_layout = QVBoxLayout()
+
+        self.cascade = QCheckBox("Ask a fast model first, a stronger model when unsure")
+        self.cascade.setChecked(
+            self.settings.value("cascade", False, type=bool)
+        )
+
+        self.cascade_threshold = QSpinBox()
+        self.cascade_threshold.setRange(50, 99)
+        self.cascade_threshold.setValue(
+            self.settings.value("cascade_threshold", 80, type=int)
+        )
+        self.cascade_threshold.setSuffix(" %")
+
+        cascade_layout.addWidget(self.cascade)
+        cascade_layout.addWidget(QLabel("Escalate answers below confidence:"))
+        cascade_layout.addWidget(self.cascade_threshold)
+
+        cascade_group.setLayout(cascade_layout)
+        layout.addWidget(cascade_group)
         
         layout.addStretch()
         return widget
@@ -182,6 +266,16 @@ class SettingsDialog(QDialog):
         # Save organization settings
         self.settings.setValue("create_backup", self.create_backup.isChecked())
         self.settings.setValue("keep_structure", self.keep_structure.isChecked())
+        self.settings.setValue("recursive", self.recursive.isChecked())
+        self.settings.setValue("skip_hidden", self.skip_hidden.isChecked())
+        self.settings.setValue("network_mode", self.network_mode.isChecked())
+        self.settings.setValue("keep_unsorted", self.keep_unsorted.isChecked())
+        self.settings.setValue("analyze_contents", self.analyze_contents.isChecked())
         self.settings.setValue("excluded_types", self.excluded_types.text())
+        self.settings.setValue("layout_scheme", self.layout_scheme.currentIndex())
+        self.settings.setValue("priority", self.priority.currentIndex())
+        self.settings.setValue("layout_max_entries", self.layout_max_entries.value())
+        self.settings.setValue("cascade", self.cascade.isChecked())
+        self.settings.setValue("cascade_threshold", self.cascade_threshold.value())
         
         self.accept()
\ No newline at end of file
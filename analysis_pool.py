@@ -0,0 +1,249 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import List, Dict, Callable, Deque, Iterable, Iterator, Optional, Tuple
+import hashlib
+import os
+import tarfile
+import zipfile
+
+class FileAnalyzer(ABC):
+    """CPU-bound per-file analysis step run inside the process pool.
+
+    Analyzers are pickled once per worker, so they should only hold plain
+    configuration and must be defined at module level.
+    """
+    name = "analyzer"
+
+    def warm_up(self):
+        """Called once per worker process before any file is analyzed."""
+        pass
+
+    @abstractmethod
+    def analyze(self, path: str) -> Dict:
+        pass
+
+class HashAnalyzer(FileAnalyzer):
+    """Content hash used for duplicate detection."""
+    name = "hash"
+
+    def __init__(self, algorithm: str = "blake2b", block_size: int = 1 << 20):
+        self.algorithm = algorithm
+        self.block_size = block_size
+
+    def warm_up(self):
+        hashlib.new(self.algorithm).update(b"")
+
+    def analyze(self, path: str) -> Dict:
+        digest = hashlib.new(self.algorithm)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(self.block_size), b""):
+                digest.update(block)
+        return {"hash": digest.hexdigest()}
+
+class ContentSniffAnalyzer(FileAnalyzer):
+    """Guess a mime type from the leading magic bytes of a file."""
+    name = "sniff"
+
+    SIGNATURES = [
+        (b"%PDF", "application/pdf"),
+        (b"\x89PNG\r\n\x1a\n", "image/png"),
+        (b"\xff\xd8\xff", "image/jpeg"),
+        (b"GIF8", "image/gif"),
+        (b"PK\x03\x04", "application/zip"),
+        (b"\x1f\x8b", "application/gzip"),
+        (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+        (b"Rar!", "application/vnd.rar"),
+        (b"ID3", "audio/mpeg"),
+        (b"fLaC", "audio/flac"),
+        (b"OggS", "audio/ogg"),
+        (b"\x1a\x45\xdf\xa3", "video/x-matroska"),
+        (b"\x7fELF", "application/x-executable"),
+    ]
+
+    def analyze(self, path: str) -> Dict:
+        with open(path, "rb") as f:
+            head = f.read(16)
+        for magic, mime_type in self.SIGNATURES:
+            if head.startswith(magic):
+                return {"sniffed_type": mime_type}
+        if len(head) >= 12 and head[4:8] == b"ftyp":
+            return {"sniffed_type": "video/mp4"}
+        return {"sniffed_type": None}
+
+class ArchiveListAnalyzer(FileAnalyzer):
+    """List member names of zip and tar archives."""
+    name = "archive"
+
+    def __init__(self, max_members: int = 50):
+        self.max_members = max_members
+
+    def analyze(self, path: str) -> Dict:
+        members = []
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                members = archive.namelist()
+        elif tarfile.is_tarfile(path):
+            with tarfile.open(path) as archive:
+                members = archive.getnames()
+        else:
+            return {}
+        return {"archive_members": members[:self.max_members],
+                "archive_member_count": len(members)}
+
+# Per-process analyzer list, set up once by _init_worker.
+_worker_analyzers: List[FileAnalyzer] = []
+
+def _init_worker(analyzers: List[FileAnalyzer]):
+    global _worker_analyzers
+    _worker_analyzers = analyzers
+    for analyzer in _worker_analyzers:
+        analyzer.warm_up()
+
+def _ping() -> int:
+    return os.getpid()
+
+def _run_analyzers(analyzers: List[FileAnalyzer], path: str) -> Dict:
+    result = {}
+    for analyzer in analyzers:
+        try:
+            result.update(analyzer.analyze(path))
+        except Exception as e:
+            result.setdefault("errors", {})[analyzer.name] = str(e)
+    return result
+
+def _analyze_chunk(shm_name: str, start: int, end: int) -> List[Dict]:
+    """Analyze the NUL-separated paths stored in shm[start:end]."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        paths = bytes(shm.buf[start:end]).split(b"\0")
+    finally:
+        shm.close()
+    return [_run_analyzers(_worker_analyzers, os.fsdecode(p)) for p in paths]
+
+class AnalysisPool:
+    """Process pool stage for CPU-bound per-file analysis.
+
+    Each chunk of paths is written into a shared memory block and the task
+    only carries the block's name, so worker start-up and task submission
+    do not pickle the path lists.
+    """
+
+    def __init__(self, analyzers: List[FileAnalyzer], max_workers: Optional[int] = None,
+                 chunk_size: int = 16):
+        self.analyzers = analyzers
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def start(self):
+        """Spawn and warm up all workers ahead of the first batch."""
+        if self._executor is None:
+            if os.name == "posix":
+                # Workers must inherit our tracker, or each would start its own
+                # and report the batch blocks as leaked when it exits.
+                resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.analyzers,)
+            )
+            pings = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+            for ping in pings:
+                ping.result()
+        return self
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers; with wait=False, chunks already running are abandoned."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _submit(self, chunk: List[Path]):
+        """Copy one chunk of paths into its own shared memory block and submit it."""
+        data = b"\0".join(os.fsencode(str(p)) for p in chunk)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        shm.buf[:len(data)] = data
+        return chunk, shm, self._executor.submit(_analyze_chunk, shm.name, 0, len(data))
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory):
+        shm.close()
+        shm.unlink()
+
+    def imap(self, paths: Iterable[Path], window: Optional[int] = None,
+             cancel_check: Callable[[], bool] = None) -> Iterator[Tuple[Path, Dict]]:
+        """Yield (path, analysis) in input order while later chunks are analyzed.
+
+        At most window chunks (default: two per worker) are in flight, so the
+        consumer can start on the first files right away and memory stays
+        bounded. Closing the iterator early cancels the chunks not yet started.
+        cancel_check is polled while waiting for a chunk; once it returns
+        True the iterator stops without waiting for the chunk.
+        """
+        if not self.analyzers:
+            yield from ((path, {}) for path in paths)
+            return
+        self.start()
+        window = window or self.max_workers * 2
+        pending: Deque = deque()
+        try:
+            chunk: List[Path] = []
+            for path in paths:
+                chunk.append(path)
+                if len(chunk) == self.chunk_size:
+                    pending.append(self._submit(chunk))
+                    chunk = []
+                    if len(pending) >= window:
+                        if not self._ready(pending[0][2], cancel_check):
+                            return
+                        yield from self._pop(pending)
+            if chunk:
+                pending.append(self._submit(chunk))
+            while pending:
+                if not self._ready(pending[0][2], cancel_check):
+                    return
+                yield from self._pop(pending)
+        finally:
+            for _, shm, future in pending:
+                future.cancel()
+                self._release(shm)
+
+    @staticmethod
+    def _ready(future, cancel_check: Callable[[], bool] = None, poll: float = 0.05) -> bool:
+        """Wait for future to finish; False if cancel_check fired first."""
+        if cancel_check is None:
+            return True
+        while not wait([future], timeout=poll).done:
+            if cancel_check():
+                return False
+        return not cancel_check()
+
+    def _pop(self, pending: Deque) -> Iterator[Tuple[Path, Dict]]:
+        chunk, shm, future = pending[0]
+        try:
+            results = future.result()
+        finally:
+            pending.popleft()
+            self._release(shm)
+        yield from zip(chunk, results)
+
+    def analyze(self, paths: Iterable[Path],
+                cancel_check: Callable[[], bool] = None) -> Dict[Path, Dict]:
+        """Run every analyzer over paths and return results keyed by path."""
+        results = {}
+        analyzed = self.imap(paths, cancel_check=cancel_check)
+        try:
+            for path, analysis in analyzed:
+                results[path] = analysis
+        finally:
+            analyzed.close()
+        return results
@@ -0,0 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Iterable, Optional
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import shutil
+import sys
+import threading
+
+BACKUP_DIRNAME = ".file_organizer_backups"
+
+# Linux ioctl to share extents between two files (btrfs, xfs, bcachefs, ...)
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem can't do that", as opposed to a real failure
+UNSUPPORTED_ERRORS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL,
+                      errno.ENOTTY, errno.EPERM, errno.EMLINK, errno.ENOSYS}
+
+_clonefile = None
+if sys.platform == "darwin":
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _clonefile = getattr(_libc, "clonefile", None)
+
+def reflink(src: Path, dst: Path):
+    """Copy-on-write clone of src at dst; raises OSError where unsupported."""
+    if _clonefile is not None:
+        if _clonefile(os.fsencode(str(src)), os.fsencode(str(dst)), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(src))
+        return
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform", str(src))
+    import fcntl
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.unlink(dst)
+            raise
+
+class BackupSnapshot:
+    """Pre-run snapshot of the files a run is about to move.
+
+    Each file is preserved with the cheapest method the filesystem supports:
+    a reflink (independent copy-on-write clone), a hardlink (same inode, so it
+    survives the move but not in-place edits) or, failing both, only a
+    manifest entry. No file data is copied. Moves made by the run are
+    journaled so restore() can put every file back where it was.
+    """
+    METHODS = ["reflink", "hardlink", "manifest"]
+
+    def __init__(self, source_dir: Path, snapshot_dir: Path):
+        self.source_dir = source_dir
+        self.snapshot_dir = snapshot_dir
+        self.files_dir = snapshot_dir / "files"
+        self.manifest_path = snapshot_dir / "manifest.json"
+        self.journal_path = snapshot_dir / "moves.jsonl"
+        self._journal = None
+        self._journal_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, source_dir: Path, files: Iterable[Path], method: str = "auto",
+               keep: int = 5, stats: Dict[Path, os.stat_result] = None) -> "BackupSnapshot":
+        """Snapshot files and prune all but the newest keep snapshots.
+
+        stats, e.g. from the scan, saves a stat() per file for the manifest.
+        """
+        root = source_dir / BACKUP_DIRNAME
+        snapshot_dir = root / datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        snapshot = cls(source_dir, snapshot_dir)
+        snapshot.files_dir.mkdir(parents=True)
+        snapshot._take(files, method, stats or {})
+        for old in sorted(p for p in root.iterdir() if p.is_dir())[:-keep]:
+            shutil.rmtree(old, ignore_errors=True)
+        return snapshot
+
+    @classmethod
+    def latest(cls, source_dir: Path) -> Optional["BackupSnapshot"]:
+        root = source_dir / BACKUP_DIRNAME
+        if not root.is_dir():
+            return None
+        snapshots = sorted(p for p in root.iterdir() if (p / "manifest.json").exists())
+        return cls(source_dir, snapshots[-1]) if snapshots else None
+
+    def _take(self, files: Iterable[Path], method: str, known_stats: Dict[Path, os.stat_result]):
+        methods = self.METHODS if method == "auto" else [method]
+        entries = []
+        created_dirs = set()
+        for file_path in files:
+            relative = file_path.relative_to(self.source_dir)
+            target = self.files_dir / relative
+            if target.parent not in created_dirs:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(target.parent)
+            stats = known_stats.get(file_path) or file_path.stat()
+            while True:
+                used = methods[0]
+                try:
+                    if used == "reflink":
+                        reflink(file_path, target)
+                    elif used == "hardlink":
+                        os.link(file_path, target)
+                    break
+                except OSError as e:
+                    # Remember the fallback for the rest of the run
+                    if e.errno not in UNSUPPORTED_ERRORS or len(methods) == 1:
+                        raise
+                    methods = methods[1:]
+            entries.append({"path": relative.as_posix(), "size": stats.st_size,
+                            "mtime_ns": stats.st_mtime_ns, "method": used})
+
+        with open(self.manifest_path, "w") as f:
+            json.dump({"source_dir": str(self.source_dir),
+                       "created": datetime.now().isoformat(),
+                       "entries": entries}, f)
+
+    def record_move(self, original: Path, new_path: Path):
+        """Journal a move made by the run, called from the organizer."""
+        with self._journal_lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a")
+            self._journal.write(json.dumps({
+                "from": original.relative_to(self.source_dir).as_posix(),
+                "to": new_path.relative_to(self.source_dir).as_posix()
+            }) + "\n")
+            self._journal.flush()
+
+    def close(self):
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def load_manifest(self) -> Dict:
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def load_moves(self) -> Dict[str, str]:
+        """Map each original relative path to where the run moved it."""
+        moves = {}
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    if line.strip():
+                        move = json.loads(line)
+                        moves[move["from"]] = move["to"]
+        # Follow files that were moved again, e.g. by a layout rebalance
+        for original, moved_to in moves.items():
+            seen = {original}
+            while moved_to in moves and moved_to not in seen:
+                seen.add(moved_to)
+                moved_to = moves[moved_to]
+            moves[original] = moved_to
+        return moves
+
+    def _restore_entry(self, entry: Dict, moves: Dict[str, str]) -> Optional[str]:
+        original = self.source_dir / entry["path"]
+        if original.exists():
+            return None
+        original.parent.mkdir(parents=True, exist_ok=True)
+        moved_to = moves.get(entry["path"])
+        if moved_to and (self.source_dir / moved_to).exists():
+            os.replace(self.source_dir / moved_to, original)
+            return None
+        saved = self.files_dir / entry["path"]
+        if entry["method"] != "manifest" and saved.exists():
+            try:
+                os.link(saved, original)
+            except OSError:
+                shutil.copy2(saved, original)
+            return None
+        return f"{entry['path']}: no copy available to restore"
+
+    def restore(self, max_workers: int = 16) -> List[str]:
+        """Put every snapshotted file back in its original place, in parallel.
+
+        Returns a list of problems for files that could not be restored.
+        """
+        self.close()
+        entries = self.load_manifest()["entries"]
+        moves = self.load_moves()
+
+        def restore_one(entry):
+            try:
+                return self._restore_entry(entry, moves)
+            except OSError as e:
+                return f"{entry['path']}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            problems = [p for p in executor.map(restore_one, entries) if p]
+        return problems
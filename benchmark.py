@@ -0,0 +1,490 @@
+"""Benchmark suite for the organizer's performance-sensitive stages.
+
+Run `python benchmark.py <name>` for a single benchmark or `python benchmark.py all`.
+Every benchmark prints a plain-text table that can be pasted into the README.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from analysis_pool import AnalysisPool, FileAnalyzer, HashAnalyzer, ContentSniffAnalyzer
+from backup import BackupSnapshot
+from cancellation import CancellationToken, OperationCancelled
+from clustering import FilenameClusterer
+
+class SlowAnalyzer(FileAnalyzer):
+    """Stands in for an expensive analyzer; module level so workers can unpickle it."""
+    name = "slow"
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def analyze(self, path: str):
+        time.sleep(self.seconds)
+        return {}
+
+def make_files(directory: Path, count: int, size: int):
+    """Create count files of size bytes with distinct content."""
+    block = os.urandom(size)
+    for i in range(count):
+        (directory / f"file_{i:06d}.bin").write_bytes(block[i % size:] + block[:i % size])
+    return sorted(directory.iterdir())
+
+def bench_pool(args):
+    """Process pool scaling on content hashing."""
+    max_workers = args.workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_files(Path(tmp), args.files, args.size)
+        analyzers = [HashAnalyzer(), ContentSniffAnalyzer()]
+        print(f"pool: {len(files)} files x {args.size} bytes, {os.cpu_count()} cores")
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>10} {'speedup':>8}")
+        baseline = None
+        workers = 1
+        while True:
+            with AnalysisPool(analyzers, max_workers=workers, chunk_size=args.chunk) as pool:
+                start = time.perf_counter()
+                pool.analyze(files)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.3f} {len(files) / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+            if workers >= max_workers:
+                break
+            workers = min(workers * 2, max_workers)
+
+def bench_index(args):
+    """Incremental rerun cost of organize_files with the snapshot index.
+
+    Most files of the inbox are answered "other" and left in place
+    (keep_unsorted), as in a triage folder; answers come from a generated
+    replay fixture, so no provider is contacted.
+    """
+    import gzip
+    import json
+    import logging
+    from file_organizer import AIProvider, ClaudeFileOrganizer, ClaudeProvider
+    from transport import FixtureTransport
+
+    new_files = max(1, args.files // 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "inbox"
+        source.mkdir()
+        names = [f"scan_{i:07d}.txt" for i in range(args.files)] + \
+                [f"new_{i:07d}.txt" for i in range(new_files)]
+        fixture = Path(tmp) / "answers.jsonl.gz"
+        replay_source = f"ClaudeProvider:{ClaudeProvider.DEFAULT_MODEL}"
+        with gzip.open(fixture, "wt", encoding="utf-8") as f:
+            for i, name in enumerate(names):
+                file_info = {"name": name, "mime_type": "text/plain"}
+                key = FixtureTransport.request_key(replay_source, AIProvider.replay_key(file_info))
+                answer = "documents" if i % 10 == 0 or name.startswith("new_") else "other"
+                f.write(json.dumps({"k": key, "r": answer, "t": 0.0}) + "\n")
+        for name in names[:args.files]:
+            (source / name).touch()
+
+        def run(incremental):
+            results = []
+            organizer = ClaudeFileOrganizer(api_key="replay", source_dir=source, incremental=incremental,
+                                            index_dir=Path(tmp) / "index",
+                                            transport=FixtureTransport(fixture, mode="replay"),
+                                            cluster_filenames=False, keep_unsorted=True)
+            start = time.perf_counter()
+            organizer.organize_files(result_callback=results.append)
+            return time.perf_counter() - start, len(results)
+
+        logging.disable(logging.INFO)
+        try:
+            first = run(True)
+            for name in names[args.files:]:
+                (source / name).touch()
+            rerun = run(True)
+            # Same workload again with nothing recorded: every kept file is asked about again
+            without_index = run(False)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    print(f"index: {args.files} files, 90% left in place, {new_files} added before the rerun")
+    print(f"{'run':>16} {'seconds':>9} {'processed':>10}")
+    for label, (seconds, processed) in (("first", first), ("rerun", rerun),
+                                         ("rerun, no index", without_index)):
+        print(f"{label:>16} {seconds:>9.3f} {processed:>10}")
+
+def bench_cancel(args):
+    """Cancel latency while waiting on the rate limit, on a hung provider request
+    and on content analysis, measured once the call has returned."""
+    import gzip
+    import logging
+    from file_organizer import ClaudeFileOrganizer
+    from transport import FixtureTransport
+
+    budget_ms = 200
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "inbox"
+        source.mkdir()
+        make_files(source, 64, 16)
+        # Nothing recorded: a file that got through analysis fails to classify and stays put
+        fixture = Path(tmp) / "empty.jsonl.gz"
+        gzip.open(fixture, "wt").close()
+
+        def organize_with_analysis(token):
+            organizer = ClaudeFileOrganizer(api_key="replay", source_dir=source, incremental=False,
+                                            cluster_filenames=False, analyzers=[SlowAnalyzer(0.5)],
+                                            analysis_workers=1,
+                                            transport=FixtureTransport(fixture, mode="replay"))
+            organizer.organize_files(cancel_token=token)
+
+        # name: (seconds before cancel, blocking call)
+        scenarios = {
+            "rate-limit wait": (0.02, lambda token: token.wait(5)),
+            "blocked request": (0.02, lambda token: token.run(time.sleep, 30)),
+            "analysis": (0.3, organize_with_analysis),
+        }
+        print(f"cancel: {args.trials} trials per scenario, budget {budget_ms} ms")
+        print(f"{'scenario':>16} {'p50 ms':>8} {'max ms':>8} {'result':>7}")
+        logging.disable(logging.INFO)
+        try:
+            for name, (delay, blocking_call) in scenarios.items():
+                latencies = []
+                for _ in range(args.trials):
+                    token = CancellationToken()
+                    done = threading.Event()
+
+                    def worker():
+                        try:
+                            blocking_call(token)
+                        except OperationCancelled:
+                            pass
+                        latencies.append(token.latency_ms())
+                        done.set()
+
+                    threading.Thread(target=worker, daemon=True).start()
+                    time.sleep(delay)
+                    token.cancel()
+                    done.wait()
+                latencies.sort()
+                p50, worst = latencies[len(latencies) // 2], latencies[-1]
+                print(f"{name:>16} {p50:>8.2f} {worst:>8.2f} {'ok' if worst < budget_ms else 'SLOW':>7}")
+        finally:
+            logging.disable(logging.NOTSET)
+
+def bench_backup(args):
+    """Snapshot and parallel restore cost compared to copying the data."""
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "source"
+        directory.mkdir()
+        files = make_files(directory, args.files, args.size)
+
+        start = time.perf_counter()
+        snapshot = BackupSnapshot.create(directory, files)
+        snapshot_time = time.perf_counter() - start
+        methods = {e["method"] for e in snapshot.load_manifest()["entries"]}
+
+        start = time.perf_counter()
+        copies = Path(tmp) / "copies"
+        copies.mkdir()
+        for f in files:
+            shutil.copy2(f, copies / f.name)
+        copy_time = time.perf_counter() - start
+
+        organized = directory / "organized"
+        organized.mkdir()
+        for f in files:
+            os.rename(f, organized / f.name)
+            snapshot.record_move(f, organized / f.name)
+        start = time.perf_counter()
+        problems = snapshot.restore()
+        restore_time = time.perf_counter() - start
+
+        print(f"backup: {args.files} files x {args.size} bytes, method {', '.join(sorted(methods))}")
+        print(f"{'step':>10} {'seconds':>9}")
+        print(f"{'snapshot':>10} {snapshot_time:>9.3f}")
+        print(f"{'full copy':>10} {copy_time:>9.3f}")
+        print(f"{'restore':>10} {restore_time:>9.3f}  ({len(problems)} problems)")
+
+def bench_cluster(args):
+    """Provider calls needed with filename clustering on a typical downloads mix."""
+    import random
+    import uuid
+    rng = random.Random(0)
+    families = [
+        lambda i: (f"IMG_{i:04d}", ".jpg", "image/jpeg"),
+        lambda i: (f"invoice-2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", ".pdf", "application/pdf"),
+        lambda i: (f"Screenshot 2024-03-{rng.randint(1, 28):02d} at {rng.randint(1, 12)}.{rng.randint(0, 59):02d}.{rng.randint(0, 59):02d}", ".png", "image/png"),
+        lambda i: (f"{uuid.UUID(int=rng.getrandbits(128))}", ".tmp", "unknown"),
+        lambda i: (f"unique document {rng.random():.12f}".replace("0.", "v"), ".docx", "application/msword"),
+    ]
+    clusterer = FilenameClusterer()
+    calls = 0
+    for i in range(args.files):
+        stem, extension, mime_type = families[i % len(families)](i)
+        file_info = {"name": stem + extension, "extension": extension, "mime_type": mime_type}
+        if clusterer.assign(file_info) is None:
+            calls += 1
+            clusterer.observe(file_info, extension)
+    print(f"cluster: {args.files} files in {len(families)} name families")
+    print(f"{'provider calls':>15} {calls:>8}")
+    print(f"{'calls saved':>15} {args.files - calls:>8} ({(args.files - calls) / args.files:.0%})")
+    print(f"{'stats':>15} {clusterer.stats()}")
+
+def bench_replay(args):
+    """Organizer overhead on a recorded session, replayed without network."""
+    if not args.fixture or not args.dir:
+        print("replay: needs --fixture (recorded with FILE_ORGANIZER_RECORD) and --dir (the same files)")
+        return
+    from file_organizer import ClaudeFileOrganizer
+    from transport import FixtureTransport
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        shutil.copytree(args.dir, source, ignore=shutil.ignore_patterns("organized", ".file_organizer_*"))
+        transport = FixtureTransport(args.fixture, mode="replay", speed=args.speed)
+        organizer = ClaudeFileOrganizer(api_key="replay", source_dir=source, provider_type=args.provider,
+                                        incremental=False, transport=transport)
+        start = time.perf_counter()
+        organizer.organize_files()
+        elapsed = time.perf_counter() - start
+        stats = transport.stats()
+
+    network = stats["network_seconds"]
+    replayed = network / args.speed if args.speed else 0.0
+    print(f"replay: {stats['requests']} requests, speed {args.speed or 'instant'}")
+    print(f"{'recorded network s':>20} {network:>9.3f}")
+    print(f"{'replay wall s':>20} {elapsed:>9.3f}")
+    print(f"{'organizer overhead s':>20} {elapsed - replayed:>9.3f}")
+
+def bench_layout(args):
+    """Largest directory and placement rate for each category layout."""
+    from layout import LayoutPolicy
+    max_entries = max(args.max_entries, LayoutPolicy.MIN_ENTRIES)
+    print(f"layout: {args.files} files into one category, split above {max_entries}")
+    print(f"{'scheme':>8} {'seconds':>9} {'dirs':>7} {'max entries':>12}")
+    for scheme in LayoutPolicy.SCHEMES:
+        with tempfile.TemporaryDirectory() as tmp:
+            category_dir = Path(tmp) / "images"
+            category_dir.mkdir()
+            layout = LayoutPolicy(scheme, max_entries=args.max_entries)
+            start = time.perf_counter()
+            for i in range(args.files):
+                name = f"IMG_{i:07d}.jpg"
+                directory = layout.directory_for(category_dir, name, time.time() - i * 3600)
+                new_path = directory / name
+                if not new_path.exists():
+                    new_path.touch()
+                layout.placed(directory)
+            elapsed = time.perf_counter() - start
+            sizes = [len(dirs) + len(files) for _, dirs, files in os.walk(category_dir)]
+        print(f"{scheme:>8} {elapsed:>9.3f} {len(sizes):>7} {max(sizes):>12}")
+
+class LatencyShim:
+    """Adds a fixed delay to every metadata call, like an SMB/NFS round trip."""
+
+    class _Entry:
+        def __init__(self, entry, delay):
+            self._entry = entry
+            self._delay = delay
+            self.name = entry.name
+            self.path = entry.path
+
+        def is_dir(self, **kwargs):
+            return self._entry.is_dir(**kwargs)
+
+        def is_file(self, **kwargs):
+            return self._entry.is_file(**kwargs)
+
+        def stat(self, **kwargs):
+            time.sleep(self._delay)
+            return self._entry.stat(**kwargs)
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.originals = {}
+
+    def _wrap(self, name, fn):
+        def delayed(*args, **kwargs):
+            time.sleep(self.delay)
+            return fn(*args, **kwargs)
+        return delayed
+
+    def __enter__(self):
+        for name in ("stat", "mkdir"):
+            self.originals[name] = getattr(os, name)
+            setattr(os, name, self._wrap(name, self.originals[name]))
+        scandir = self.originals["scandir"] = os.scandir
+        shim = self
+
+        class _Scandir:
+            def __init__(self, path):
+                time.sleep(shim.delay)
+                self._it = scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def __iter__(self):
+                return (LatencyShim._Entry(e, shim.delay) for e in self._it)
+
+        os.scandir = _Scandir
+        return self
+
+    def __exit__(self, *exc):
+        for name, fn in self.originals.items():
+            setattr(os, name, fn)
+
+def bench_netfs(args):
+    """Metadata throughput of serial vs prefetching mode at injected latencies."""
+    from file_filters import FileFilter, scan
+    from netfs import ExistenceCache, MetadataPrefetcher
+    categories = ["documents", "images", "audio", "video", "archives", "code", "data", "downloads", "other"]
+
+    def run(source, organized, network_mode):
+        prefetcher = MetadataPrefetcher(args.workers or 32) if network_mode else None
+        existence = ExistenceCache() if network_mode else None
+        known_dirs = set()
+        if prefetcher:
+            dirs = [organized / c for c in categories]
+            prefetcher.make_dirs(dirs)
+            known_dirs.update(dirs)
+            existence.prefetch(dirs, prefetcher)
+        count = 0
+        for i, (path, _) in enumerate(scan(source, FileFilter().compile(), prefetcher=prefetcher)):
+            category_dir = organized / categories[i % len(categories)]
+            if category_dir not in known_dirs:
+                category_dir.mkdir(exist_ok=True)
+                known_dirs.add(category_dir)
+            new_path = category_dir / path.name
+            new_path_exists = existence.exists(new_path) if existence else new_path.exists()
+            count += not new_path_exists
+        if prefetcher:
+            prefetcher.shutdown()
+        return count
+
+    # Every call sleeps in the shim, so the serial runs are kept short
+    files = min(args.files, 1000)
+    capped = f" (--files capped at {files})" if files < args.files else ""
+    print(f"netfs: scan, stat, mkdir and destination checks for {files} files{capped}")
+    print(f"{'latency ms':>10} {'serial f/s':>11} {'prefetch f/s':>13} {'speedup':>8}")
+    for latency_ms in (0, 1, 5, 20):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "source"
+            source.mkdir()
+            for i in range(files):
+                (source / f"file_{i:06d}.txt").touch()
+            rates = []
+            for network_mode in (False, True):
+                organized = Path(tmp) / f"organized_{network_mode}"
+                organized.mkdir()
+                with LatencyShim(latency_ms / 1000):
+                    start = time.perf_counter()
+                    run(source, organized, network_mode)
+                    rates.append(files / (time.perf_counter() - start))
+        print(f"{latency_ms:>10} {rates[0]:>11.0f} {rates[1]:>13.0f} {rates[1] / rates[0]:>7.1f}x")
+
+def bench_priority(args):
+    """Files processed before the newest 5% are organized, per priority policy."""
+    import random
+    from scheduler import PriorityScheduler
+    rng = random.Random(0)
+    now = time.time()
+    # Scan order is arbitrary with respect to age, like a real directory listing
+    items = [(Path(f"file_{i:06d}.bin"), os.stat_result((0o100644, 0, 0, 1, 0, 0, rng.randint(1, 10 ** 7),
+                                                         0, now - rng.random() * 3e7, 0)))
+             for i in range(args.files)]
+    wanted = {path for path, _ in sorted(items, key=lambda item: -item[1].st_mtime)[:max(1, args.files // 20)]}
+    print(f"priority: {args.files} files, steps until the newest {len(wanted)} are done")
+    print(f"{'policy':>12} {'first':>7} {'all':>7}")
+    files = [path for path, _ in items]
+    stats = dict(items)
+    for policy in ("scan", "newest"):
+        start = time.perf_counter()
+        ordered = PriorityScheduler(policy).order(files, stats)
+        elapsed = time.perf_counter() - start
+        steps = [step for step, path in enumerate(ordered, 1) if path in wanted]
+        print(f"{policy:>12} {steps[0]:>7} {steps[-1]:>7}  ({elapsed * 1000:.1f} ms to order)")
+
+def bench_jobs(args):
+    """Fair sharing of one rate budget between a huge job and several small ones."""
+    from rate_budget import RateBudget
+    interval = 0.002
+    budget = RateBudget(interval)
+    # (name, weight, requests, start delay in slots)
+    specs = [("huge", 1, args.files, 0), ("heavy", 2, args.files, 0),
+             ("small a", 1, 20, 50), ("small b", 1, 20, 100)]
+    finished = {}
+    shares = {}
+
+    def job(name, weight, requests, delay, token):
+        time.sleep(delay * interval)
+        share = shares[name] = budget.share(weight, name)
+        started = time.perf_counter()
+        try:
+            for _ in range(requests):
+                share.wait(token)
+        except OperationCancelled:
+            return
+        finished[name] = (share.granted, time.perf_counter() - started)
+
+    token = CancellationToken()
+    threads = [threading.Thread(target=job, args=spec + (token,)) for spec in specs]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while len(finished) < 2 and time.perf_counter() - start < 60:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    # Snapshot before stopping the big jobs, so only the shared period is counted
+    granted = budget.granted
+    heavy, huge = shares["heavy"].granted, shares["huge"].granted
+    token.cancel()
+    for thread in threads:
+        thread.join()
+
+    print(f"jobs: slot every {interval * 1000:.0f} ms, two big jobs (weights 1 and 2) and two late small ones")
+    print(f"{'job':>10} {'requests':>9} {'seconds':>8} {'alone s':>8}")
+    for name, _, requests, _ in specs[2:]:
+        count, seconds = finished.get(name, (0, float("nan")))
+        print(f"{name:>10} {count:>9} {seconds:>8.3f} {requests * interval:>8.3f}")
+    print(f"{'heavy/huge':>10} {heavy / max(huge, 1):>9.2f}  (weights 2/1)")
+    print(f"{'slots used':>10} {granted / (elapsed / interval):>9.0%}")
+
+BENCHMARKS = {
+    "jobs": bench_jobs,
+    "priority": bench_priority,
+    "netfs": bench_netfs,
+    "layout": bench_layout,
+    "replay": bench_replay,
+    "cluster": bench_cluster,
+    "backup": bench_backup,
+    "cancel": bench_cancel,
+    "pool": bench_pool,
+    "index": bench_index,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS) + ["all"])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=16)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--fixture", default=None)
+    parser.add_argument("--dir", default=None)
+    parser.add_argument("--provider", default="claude")
+    parser.add_argument("--speed", type=float, default=None)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    names = sorted(BENCHMARKS) if args.benchmark == "all" else [args.benchmark]
+    for name in names:
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+from typing import Callable, List, Optional
+import threading
+import time
+
+class OperationCancelled(Exception):
+    """Raised inside a run when its CancellationToken has been cancelled."""
+    pass
+
+class CancellationToken:
+    """Cooperative pause/cancel signal shared between the GUI and a running organizer.
+
+    Waits and blocking calls made through the token wake up as soon as cancel()
+    is called, instead of at the next polling point.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.cancel_requested_at: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def cancel(self):
+        """Request cancellation and run abort callbacks. Never blocks on the run."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self.cancel_requested_at = time.monotonic()
+            self._cancelled.set()
+            self._resumed.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register an abort callback, run immediately if already cancelled."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return callback
+        callback()
+        return callback
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise OperationCancelled()
+
+    def wait(self, seconds: float):
+        """Sleep for up to seconds, returning early by raising OperationCancelled."""
+        if self._cancelled.wait(seconds):
+            raise OperationCancelled()
+
+    def wait_if_paused(self):
+        """Block while paused; cancel() also releases the wait."""
+        self._resumed.wait()
+        self.raise_if_cancelled()
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking call on a helper thread and abandon it on cancel.
+
+        The call itself is expected to give up on its own (request timeout or a
+        client closed by an on_cancel callback); the caller does not wait for it.
+        """
+        self.raise_if_cancelled()
+        outcome = {}
+        finished = threading.Event()
+
+        def target():
+            try:
+                outcome["value"] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+        wake = self.on_cancel(finished.set)
+        threading.Thread(target=target, daemon=True).start()
+        finished.wait()
+        self.remove_callback(wake)
+
+        if "error" in outcome:
+            raise outcome["error"]
+        if "value" not in outcome:
+            raise OperationCancelled()
+        return outcome["value"]
+
+    def latency_ms(self) -> Optional[float]:
+        """Milliseconds since cancel() was requested, for cancel latency reporting."""
+        if self.cancel_requested_at is None:
+            return None
+        return (time.monotonic() - self.cancel_requested_at) * 1000
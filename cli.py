@@ -0,0 +1,134 @@
+"""Organize one or more directories from the command line.
+
+Each directory runs as its own job; all jobs share the provider's rate limit
+in proportion to their weights. Give a weight by appending `=N` to a
+directory, e.g. `python cli.py ~/Downloads=2 /srv/scans/alice /srv/scans/bob`.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from pathlib import Path
+
+from analysis_pool import ContentSniffAnalyzer, HashAnalyzer
+from file_filters import FileFilter
+from jobs import Job, JobScheduler
+from layout import LayoutPolicy
+from scheduler import POLICIES
+from transport import transport_from_env
+
+API_KEY_VARIABLES = {
+    "claude": "ANTHROPIC_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "groq": "GROQ_API_KEY",
+}
+
+def parse_job(text: str):
+    """Split `path=weight` into (Path, weight); a plain path has weight 1."""
+    path, separator, weight = text.rpartition("=")
+    if separator and not Path(text).exists():
+        try:
+            return Path(path).expanduser(), float(weight)
+        except ValueError:
+            pass
+    return Path(text).expanduser(), 1.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directories", nargs="+", metavar="DIR[=WEIGHT]")
+    parser.add_argument("--provider", choices=sorted(API_KEY_VARIABLES), default="claude")
+    parser.add_argument("--api-key", default=None,
+                        help="defaults to the provider's usual environment variable")
+    parser.add_argument("--rate-limit", type=float, default=5.0,
+                        help="seconds between provider requests, shared by all jobs")
+    parser.add_argument("--max-jobs", type=int, default=None,
+                        help="directories organized at the same time (default: all)")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--include-hidden", action="store_true")
+    parser.add_argument("--exclude", default="", help="comma separated extensions, globs or re: patterns")
+    parser.add_argument("--backup", action="store_true", help="snapshot each directory before moving files")
+    parser.add_argument("--priority", choices=["scan"] + sorted(POLICIES), default="scan")
+    parser.add_argument("--layout", choices=LayoutPolicy.SCHEMES, default="flat")
+    parser.add_argument("--max-entries", type=int, default=10000)
+    parser.add_argument("--network", action="store_true", help="network filesystem mode")
+    parser.add_argument("--cascade", action="store_true",
+                        help="ask a fast model first and a stronger one when it is unsure")
+    parser.add_argument("--cascade-threshold", type=float, default=0.8,
+                        help="lowest confidence (0-1) the fast model's answer is kept at")
+    parser.add_argument("--fast-model", default=None, help="fast cascade model (default: the provider's)")
+    parser.add_argument("--strong-model", default=None, help="strong cascade model (default: the provider's)")
+    parser.add_argument("--keep-unsorted", action="store_true",
+                        help='leave files classified as "other" in place')
+    parser.add_argument("--analyze", action="store_true",
+                        help="read file contents locally to detect types and duplicates")
+    args = parser.parse_args(argv)
+
+    api_key = args.api_key or os.environ.get(API_KEY_VARIABLES[args.provider])
+    if not api_key:
+        parser.error(f"no API key: pass --api-key or set {API_KEY_VARIABLES[args.provider]}")
+    if not 0.0 <= args.cascade_threshold <= 1.0:
+        parser.error("--cascade-threshold must be between 0 and 1")
+    jobs = [parse_job(text) for text in args.directories]
+    for directory, _ in jobs:
+        if not directory.is_dir():
+            parser.error(f"not a directory: {directory}")
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    print_lock = threading.Lock()
+    reported = {}
+
+    def report(job: Job):
+        # One line per status change and per 10% of progress
+        state = (job.status, job.progress // 10)
+        if reported.get(job.id) == state:
+            return
+        reported[job.id] = state
+        with print_lock:
+            detail = f" ({job.error})" if job.error else ""
+            print(f"[{job.id}] {job.source_dir}: {job.status} {job.progress}% "
+                  f"{job.processed} files, {job.errors} errors, {job.share.granted} requests{detail}",
+                  flush=True)
+
+    scheduler = JobScheduler(
+        api_key=api_key,
+        provider_type=args.provider,
+        rate_limit_delay=args.rate_limit,
+        max_concurrent=args.max_jobs,
+        transport=transport_from_env(),
+        job_callback=report,
+        file_filter=FileFilter.from_excluded_types(args.exclude,
+                                                   exclude_hidden=not args.include_hidden,
+                                                   exclude_system=not args.include_hidden),
+        recursive=args.recursive,
+        create_backup=args.backup,
+        cascade=args.cascade,
+        cascade_thresholds=[args.cascade_threshold],
+        cascade_models=[args.fast_model, args.strong_model],
+        network_mode=args.network,
+        priority=args.priority,
+        keep_unsorted=args.keep_unsorted,
+        analyzers=[HashAnalyzer(), ContentSniffAnalyzer()] if args.analyze else None,
+    )
+    for directory, weight in jobs:
+        # Layout policies cache per-run directory state, so every job gets its own
+        scheduler.add(directory, weight=weight,
+                      layout=LayoutPolicy(scheme=args.layout, max_entries=args.max_entries))
+
+    scheduler.start()
+    try:
+        finished = scheduler.wait()
+    except KeyboardInterrupt:
+        print("Cancelling...", flush=True)
+        scheduler.cancel()
+        finished = scheduler.wait()
+    finally:
+        if scheduler.transport:
+            scheduler.transport.close()
+    return 0 if all(job.status == "done" for job in finished) else 1
+
+if __name__ == "__main__":
+    # Needed for the analysis process pool in frozen builds
+    multiprocessing.freeze_support()
+    sys.exit(main())
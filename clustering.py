@@ -0,0 +1,86 @@
+from typing import Dict, Optional, Tuple
+import re
+
+# Ordered most specific first: UUIDs and hashes would otherwise be eaten as digit runs
+_PATTERNS = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"), "{uuid}"),
+    (re.compile(r"(?<![0-9a-z])(?=[0-9a-f]*[a-f])(?=[0-9a-f]*[0-9])[0-9a-f]{12,}(?![0-9a-z])"), "{hash}"),
+    (re.compile(r"(?:19|20)\d{2}[-_.]?(?:0[1-9]|1[0-2])[-_.]?(?:0[1-9]|[12]\d|3[01])"
+                r"(?:[ t_-]?\d{1,2}[.:_-]?\d{2}(?:[.:_-]?\d{2})?(?:\s?[ap]m)?)?"), "{date}"),
+    (re.compile(r"\d+"), "{n}"),
+]
+
+def filename_template(stem: str) -> str:
+    """Collapse the variable parts of a file name into placeholders.
+
+    `IMG_0001` -> `img_{n}`, `Screenshot 2024-03-01 at 10.15.22` ->
+    `screenshot {date} at {n}.{n}.{n}`, `invoice-2024-03-17` -> `invoice-{date}`.
+    """
+    template = stem.lower()
+    for pattern, placeholder in _PATTERNS:
+        template = pattern.sub(placeholder, template)
+    return template
+
+ClusterKey = Tuple[str, str, str]
+
+class _Cluster:
+    def __init__(self):
+        self.category: Optional[str] = None
+        self.members = 0
+        self.stable = True
+
+class FilenameClusterer:
+    """Groups files by (name template, extension, mime type) so that one
+    classification can be reused for every file in the same family.
+
+    The first file of a cluster is classified normally. Later members reuse
+    its category, except for the first verify_first members and every
+    sample_every-th member after that, which are classified again as a check.
+    A disagreeing check turns fan-out off for that cluster.
+    """
+
+    def __init__(self, verify_first: int = 1, sample_every: int = 25):
+        self.verify_first = verify_first
+        self.sample_every = sample_every
+        self.clusters: Dict[ClusterKey, _Cluster] = {}
+        self.fanned_out = 0
+        self.checks = 0
+
+    @staticmethod
+    def cluster_key(file_info: Dict) -> ClusterKey:
+        name = file_info["name"]
+        stem = name[:-len(file_info["extension"])] if file_info["extension"] else name
+        return (filename_template(stem), file_info["extension"].lower(), file_info["mime_type"])
+
+    def assign(self, file_info: Dict) -> Optional[str]:
+        """Return the cluster's category to reuse, or None if this file must be classified."""
+        cluster = self.clusters.setdefault(self.cluster_key(file_info), _Cluster())
+        cluster.members += 1
+        if cluster.category is None or not cluster.stable:
+            return None
+        member = cluster.members - 1
+        if member <= self.verify_first or member % self.sample_every == 0:
+            self.checks += 1
+            return None
+        self.fanned_out += 1
+        return cluster.category
+
+    def observe(self, file_info: Dict, category: str) -> bool:
+        """Record a real classification; returns False if it contradicts the cluster."""
+        cluster = self.clusters.setdefault(self.cluster_key(file_info), _Cluster())
+        if cluster.category is None:
+            cluster.category = category
+            return True
+        if cluster.category != category:
+            cluster.stable = False
+            return False
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clusters": len(self.clusters),
+            "multi_file_clusters": sum(1 for c in self.clusters.values() if c.members > 1),
+            "unstable_clusters": sum(1 for c in self.clusters.values() if not c.stable),
+            "fanned_out": self.fanned_out,
+            "checks": self.checks,
+        }
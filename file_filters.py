@@ -0,0 +1,184 @@
+from pathlib import Path
+from typing import List, Iterator, Iterable, Optional, Tuple
+import fnmatch
+import os
+import re
+import stat
+import time
+
+SYSTEM_NAMES = {".ds_store", "thumbs.db", "desktop.ini", "icon\r", ".localized", "ehthumbs.db"}
+
+class FileFilter:
+    """Exclusion rules for a run. Call compile() once and use the result while scanning."""
+
+    def __init__(self, extensions: Iterable[str] = None, globs: Iterable[str] = None,
+                 regexes: Iterable[str] = None, names: Iterable[str] = None,
+                 min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 min_age_days: Optional[float] = None, max_age_days: Optional[float] = None,
+                 exclude_hidden: bool = False, exclude_system: bool = False):
+        self.extensions = {self._normalize_extension(e) for e in (extensions or [])}
+        self.globs = list(globs or [])
+        self.regexes = list(regexes or [])
+        self.names = set(names or [])
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_age_days = min_age_days
+        self.max_age_days = max_age_days
+        self.exclude_hidden = exclude_hidden
+        self.exclude_system = exclude_system
+
+    @staticmethod
+    def _normalize_extension(extension: str) -> str:
+        extension = extension.strip().lower()
+        return extension if extension.startswith(".") else f".{extension}"
+
+    @classmethod
+    def from_excluded_types(cls, text: str, **kwargs) -> "FileFilter":
+        """Parse the comma separated `excluded_types` setting.
+
+        Plain entries (`.tmp`, `log`) are extensions, entries with glob characters
+        (`~$*`, `cache/*`) are globs and `re:` entries are regular expressions.
+        """
+        extensions, globs, regexes = [], [], []
+        for entry in (text or "").split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            if entry.startswith("re:"):
+                regexes.append(entry[3:])
+            elif any(c in entry for c in "*?[/"):
+                globs.append(entry)
+            else:
+                extensions.append(entry)
+        return cls(extensions=extensions, globs=globs, regexes=regexes, **kwargs)
+
+    def compile(self, reserved_names: Iterable[str] = (), reserved_dirs: Iterable[Path] = ()) -> "CompiledFilter":
+        return CompiledFilter(self, reserved_names, reserved_dirs)
+
+class CompiledFilter:
+    """All rules of a FileFilter merged into one matcher.
+
+    Name-only rules are checked first so excluded entries are never stat'd;
+    size and age rules only run on entries that survive them.
+    """
+
+    # Windows FILE_ATTRIBUTE_HIDDEN / FILE_ATTRIBUTE_SYSTEM
+    _HIDDEN_ATTRIBUTE = getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0x2)
+    _SYSTEM_ATTRIBUTE = getattr(stat, "FILE_ATTRIBUTE_SYSTEM", 0x4)
+
+    def __init__(self, rules: FileFilter, reserved_names: Iterable[str], reserved_dirs: Iterable[Path]):
+        self.extensions = frozenset(e for e in rules.extensions if e.count(".") == 1)
+        # `.tar.gz` style entries span several suffixes, so they match the end of the name
+        self.multi_extensions = tuple(e for e in rules.extensions if e.count(".") > 1)
+        self.names = frozenset(rules.names) | frozenset(reserved_names)
+        self.reserved_dirs = frozenset(os.path.normcase(os.path.abspath(d)) for d in reserved_dirs)
+        self.exclude_hidden = rules.exclude_hidden
+        self.exclude_system = rules.exclude_system
+
+        # Globs without a separator match the entry name, the rest match the relative path
+        name_patterns = [fnmatch.translate(g) for g in rules.globs if "/" not in g] + rules.regexes
+        path_patterns = [fnmatch.translate(g) for g in rules.globs if "/" in g]
+        self.name_pattern = re.compile("|".join(f"(?:{p})" for p in name_patterns), re.IGNORECASE) if name_patterns else None
+        self.path_pattern = re.compile("|".join(f"(?:{p})" for p in path_patterns), re.IGNORECASE) if path_patterns else None
+
+        now = time.time()
+        self.min_size = rules.min_size
+        self.max_size = rules.max_size
+        # Age bounds become mtime bounds: older than min_age means mtime <= newest_mtime
+        self.newest_mtime = now - rules.min_age_days * 86400 if rules.min_age_days is not None else None
+        self.oldest_mtime = now - rules.max_age_days * 86400 if rules.max_age_days is not None else None
+        self.needs_stat = any(v is not None for v in (self.min_size, self.max_size, self.newest_mtime, self.oldest_mtime))
+
+    def _excludes_name(self, entry: os.DirEntry, relative: str) -> bool:
+        name = entry.name
+        if name in self.names:
+            return True
+        if self.exclude_hidden and name.startswith("."):
+            return True
+        if self.exclude_system and name.lower() in SYSTEM_NAMES:
+            return True
+        if self.name_pattern and self.name_pattern.match(name):
+            return True
+        if self.path_pattern and self.path_pattern.match(relative):
+            return True
+        if os.name == "nt" and (self.exclude_hidden or self.exclude_system):
+            # Free on Windows: scandir already has the attributes cached
+            attributes = entry.stat(follow_symlinks=False).st_file_attributes
+            if self.exclude_hidden and attributes & self._HIDDEN_ATTRIBUTE:
+                return True
+            if self.exclude_system and attributes & self._SYSTEM_ATTRIBUTE:
+                return True
+        return False
+
+    def excludes_dir(self, entry: os.DirEntry, relative: str) -> bool:
+        if os.path.normcase(os.path.abspath(entry.path)) in self.reserved_dirs:
+            return True
+        # A path glob such as `cache/*` also prunes the `cache` subtree itself
+        if self.path_pattern and self.path_pattern.match(relative + "/"):
+            return True
+        return self._excludes_name(entry, relative)
+
+    def excludes_file(self, entry: os.DirEntry, relative: str) -> bool:
+        if self._excludes_name(entry, relative):
+            return True
+        name = entry.name.lower()
+        if os.path.splitext(name)[1] in self.extensions:
+            return True
+        return bool(self.multi_extensions) and name.endswith(self.multi_extensions)
+
+    def excludes_stat(self, stats: os.stat_result) -> bool:
+        if self.min_size is not None and stats.st_size < self.min_size:
+            return True
+        if self.max_size is not None and stats.st_size > self.max_size:
+            return True
+        if self.newest_mtime is not None and stats.st_mtime > self.newest_mtime:
+            return True
+        if self.oldest_mtime is not None and stats.st_mtime < self.oldest_mtime:
+            return True
+        return False
+
+def scan(root: Path, matcher: CompiledFilter, recursive: bool = False,
+         prefetcher=None) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for every file under root that the matcher keeps.
+
+    Excluded directories are pruned without being listed, and excluded files
+    are rejected before their stat is taken. With a MetadataPrefetcher the
+    stat calls of each directory are issued concurrently.
+    """
+    stack: List[Tuple[str, str]] = [(str(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        candidates = []
+        for entry in entries:
+            relative = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not matcher.excludes_dir(entry, relative):
+                        stack.append((entry.path, relative + "/"))
+                    continue
+                if not entry.is_file() or matcher.excludes_file(entry, relative):
+                    continue
+            except OSError:
+                continue
+            candidates.append(entry)
+
+        if prefetcher:
+            stated = prefetcher.map(lambda entry: entry.stat(), candidates)
+        else:
+            stated = _stat_serially(candidates)
+        for entry, stats in stated:
+            if matcher.needs_stat and matcher.excludes_stat(stats):
+                continue
+            yield Path(entry.path), stats
+
+def _stat_serially(entries: List[os.DirEntry]) -> Iterator[Tuple[os.DirEntry, os.stat_result]]:
+    for entry in entries:
+        try:
+            yield entry, entry.stat()
+        except OSError:
+            continue
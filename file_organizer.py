@@ -1,33 +1,72 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Callable
-import anthropic
+from typing import List, Dict, Callable, Optional, Tuple, Union
+from analysis_pool import AnalysisPool, FileAnalyzer
+from backup import BACKUP_DIRNAME, BackupSnapshot
+from cancellation import CancellationToken, OperationCancelled
+from clustering import FilenameClusterer
+from file_filters import FileFilter, scan
+from layout import LayoutPolicy
+from netfs import ExistenceCache, MetadataPrefetcher
+from rate_budget import RateShare
+from scheduler import PriorityScheduler, ScoreFunction
+from snapshot_index import SnapshotIndex
+from transport import FixtureTransport
 import anthropic
 import groq
 import logging
 import mimetypes
 import openai
 import os
+import re
 import shutil
 import time
 
+CATEGORIES = ["documents", "images", "audio", "video", "archives", "code", "data", "downloads", "other"]
+CATEGORY_PATTERN = re.compile(r"\b(" + "|".join(CATEGORIES) + r")\b")
+# A confidence such as 0.9, .9, 1 or 90%
+CONFIDENCE_PATTERN = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?|\.\d+)\s*(%?)")
+
 class AIProvider(ABC):
+    # Decision source reported for the last classification
+    last_source = "llm"
+    # Optional record/replay transport all requests go through
+    transport: Optional[FixtureTransport] = None
+    # Called before every request, e.g. to wait for the rate limit
+    before_request: Optional[Callable[[], None]] = None
+    # Time spent in requests themselves, without before_request
+    request_seconds = 0.0
+
     @abstractmethod
     def __init__(self, api_key: str):
         pass
 
     @abstractmethod
-    def classify_file(self, file_info: Dict) -> str:
+    def complete(self, prompt: str) -> str:
+        """Send a prompt to the model and return its raw text answer."""
         pass
 
-class ClaudeProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
-    
-    def classify_file(self, file_info: Dict) -> str:
+    def request(self, prompt: str, replay_key: str = None) -> str:
+        """complete() through the transport, if one is set."""
+        if self.before_request is not None:
+            self.before_request()
+        start = time.monotonic()
         try:
-            prompt = f"""
+            if self.transport is None:
+                return self.complete(prompt)
+            source = f"{type(self).__name__}:{getattr(self, 'model', '')}"
+            return self.transport.send(source, prompt, self.complete, replay_key)
+        finally:
+            self.request_seconds += time.monotonic() - start
+
+    @staticmethod
+    def replay_key(file_info: Dict, with_confidence: bool = False) -> str:
+        # Leaves out the creation date, which changes when a workload is copied
+        return f"{file_info['name']}\0{file_info['mime_type']}\0{with_confidence}"
+
+    def build_prompt(self, file_info: Dict, with_confidence: bool = False) -> str:
+        prompt = f"""
             You are a productivity guru! 🧠📚🚀
             Based on the following file information, suggest a single appropriate category folder name:
             Filename: {file_info['name']}
@@ -35,97 +74,263 @@ class ClaudeProvider(AIProvider):
             Created: {file_info['created']}
             
             Respond with just the category name (one word, lowercase) from these options:
-            documents, images, audio, video, archives, code, data, downloads, other
+            {", ".join(CATEGORIES)}
             """
-            
+        if with_confidence:
+            prompt += """
+            Follow it with your confidence between 0 and 1, for example: images 0.85
+            """
+        return prompt
+
+    def classify_file(self, file_info: Dict) -> str:
+        category = self.request(self.build_prompt(file_info), self.replay_key(file_info)).strip().lower()
+        return category if category in CATEGORIES else "other"
+
+    def classify_with_confidence(self, file_info: Dict) -> Tuple[Optional[str], float]:
+        """Return (category, confidence); category is None for out-of-vocabulary answers.
+
+        Models do not always keep to the `images 0.85` format, so the first
+        category word and the first confidence anywhere in the answer are
+        used, e.g. in "Category: images (0.9)". A missing confidence is 0.
+        """
+        answer = self.request(self.build_prompt(file_info, with_confidence=True),
+                              self.replay_key(file_info, with_confidence=True)).strip().lower()
+        category = CATEGORY_PATTERN.search(answer)
+        if not category:
+            return None, 0.0
+        for number, percent in CONFIDENCE_PATTERN.findall(answer):
+            confidence = float(number) / (100 if percent else 1)
+            if 0.0 <= confidence <= 1.0:
+                return category.group(1), confidence
+        return category.group(1), 0.0
+
+    def set_request_hook(self, hook: Optional[Callable[[], None]]):
+        self.before_request = hook
+
+    def close(self):
+        """Close the SDK client, aborting any request still in flight."""
+        client = getattr(self, "client", None)
+        if client is not None:
+            client.close()
+
+class ClaudeProvider(AIProvider):
+    DEFAULT_MODEL = "claude-3-sonnet-20240229"
+    FAST_MODEL = "claude-3-haiku-20240307"
+    STRONG_MODEL = DEFAULT_MODEL
+
+    def __init__(self, api_key: str, timeout: float = 30.0, model: str = None):
+        self.client = anthropic.Anthropic(api_key=api_key, timeout=timeout)
+        self.model = model or self.DEFAULT_MODEL
+    
+    def complete(self, prompt: str) -> str:
+        try:
             message = self.client.messages.create(
-                model="claude-3-sonnet-20240229",
+                model=self.model,
                 max_tokens=1024,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
             )
-            
-            category = message.content[0].text.strip().lower()
-            return category if category in ["documents", "images", "audio", "video", "archives", "code", "data", "downloads", "other"] else "other"
+            return message.content[0].text
         except Exception as e:
             raise Exception(f"Claude API error: {str(e)}")
 
 class OpenAIProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.client = openai.Client(api_key=api_key)
+    DEFAULT_MODEL = "gpt-4o"
+    FAST_MODEL = "gpt-4o-mini"
+    STRONG_MODEL = DEFAULT_MODEL
+
+    def __init__(self, api_key: str, timeout: float = 30.0, model: str = None):
+        self.client = openai.Client(api_key=api_key, timeout=timeout)
+        self.model = model or self.DEFAULT_MODEL
     
-    def classify_file(self, file_info: Dict) -> str:
+    def complete(self, prompt: str) -> str:
         try:
-            prompt = f"""
-            You are a productivity guru! 🧠📚🚀
-            Based on the following file information, suggest a single appropriate category folder name:
-            Filename: {file_info['name']}
-            Type: {file_info['mime_type']}
-            Created: {file_info['created']}
-            
-            Respond with just the category name (one word, lowercase) from these options:
-            documents, images, audio, video, archives, code, data, downloads, other
-            """
-            
             response = self.client.chat.completions.create(
-                model="gpt-4o",
+                model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a helpful file organization assistant."},
                     {"role": "user", "content": prompt}
                 ]
             )
-            
-            category = response.choices[0].message.content.strip().lower()
-            return category if category in ["documents", "images", "audio", "video", "archives", "code", "data", "downloads", "other"] else "other"
+            return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
 
 class GroqProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.client = groq.Groq(api_key=api_key)
+    DEFAULT_MODEL = "llama-3.2-3b-preview"
+    FAST_MODEL = DEFAULT_MODEL
+    STRONG_MODEL = "llama-3.3-70b-versatile"
+
+    def __init__(self, api_key: str, timeout: float = 30.0, model: str = None):
+        self.client = groq.Groq(api_key=api_key, timeout=timeout)
+        self.model = model or self.DEFAULT_MODEL
     
-    def classify_file(self, file_info: Dict) -> str:
+    def complete(self, prompt: str) -> str:
         try:
-            prompt = f"""
-            You are a productivity guru! 🧠📚🚀
-            Based on the following file information, suggest a single appropriate category folder name:
-            Filename: {file_info['name']}
-            Type: {file_info['mime_type']}
-            Created: {file_info['created']}
-            
-            Respond with just the category name (one word, lowercase) from these options:
-            documents, images, audio, video, archives, code, data, downloads, other
-            """
-            
             completion = self.client.chat.completions.create(
-                model="llama-3.2-3b-preview",
+                model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a helpful file organization assistant."},
                     {"role": "user", "content": prompt}
                 ]
             )
-            
-            category = completion.choices[0].message.content.strip().lower()
-            return category if category in ["documents", "images", "audio", "video", "archives", "code", "data", "downloads", "other"] else "other"
+            return completion.choices[0].message.content
         except Exception as e:
             raise Exception(f"Groq API error: {str(e)}")
 
+PROVIDERS = {
+    "claude": ClaudeProvider,
+    "openai": OpenAIProvider,
+    "groq": GroqProvider,
+}
+
+class CascadeTier:
+    def __init__(self, provider: AIProvider, min_confidence: float = 0.8, name: str = None):
+        self.provider = provider
+        self.min_confidence = min_confidence
+        self.name = name or getattr(provider, "model", type(provider).__name__)
+        self.answered = 0
+        self.escalated = 0
+        self.failed = 0
+
+    @property
+    def seconds(self) -> float:
+        """Model latency of this tier, excluding rate-limit waits."""
+        return self.provider.request_seconds
+
+class CascadeProvider(AIProvider):
+    """Ask cheap, fast tiers first and only escalate doubtful answers.
+
+    Every tier but the last must return an in-vocabulary category with a
+    confidence of at least its min_confidence; otherwise, or if its request
+    fails, the file moves on to the next tier. The last tier's answer is
+    always accepted.
+    """
+
+    def __init__(self, tiers: List[CascadeTier]):
+        if not tiers:
+            raise ValueError("A cascade needs at least one tier")
+        self.tiers = tiers
+        self.files = 0
+
+    def complete(self, prompt: str) -> str:
+        return self.tiers[-1].provider.complete(prompt)
+
+    def classify_file(self, file_info: Dict) -> str:
+        self.files += 1
+        for tier in self.tiers[:-1]:
+            try:
+                category, confidence = tier.provider.classify_with_confidence(file_info)
+            except OperationCancelled:
+                raise
+            except Exception:
+                category, confidence = None, 0.0
+                tier.failed += 1
+            if category is not None and confidence >= tier.min_confidence:
+                tier.answered += 1
+                self.last_source = f"llm:{tier.name}"
+                return category
+            tier.escalated += 1
+
+        last = self.tiers[-1]
+        category = last.provider.classify_file(file_info)
+        last.answered += 1
+        self.last_source = f"llm:{last.name}"
+        return category
+
+    def stats(self) -> Dict:
+        first = self.tiers[0]
+        asked = first.answered + first.escalated
+        return {
+            "files": self.files,
+            "escalation_rate": round(first.escalated / asked, 3) if asked else 0.0,
+            "tiers": [{"name": t.name, "answered": t.answered, "escalated": t.escalated, "failed": t.failed,
+                       "avg_seconds": round(t.seconds / max(1, t.answered + t.escalated), 3)}
+                      for t in self.tiers],
+        }
+
+    def set_request_hook(self, hook: Optional[Callable[[], None]]):
+        # Each tier's request is a separate call against the rate limit
+        for tier in self.tiers:
+            tier.provider.set_request_hook(hook)
+
+    def close(self):
+        for tier in self.tiers:
+            tier.provider.close()
+
+def create_provider(provider_type: str, api_key: str, cascade: bool = False,
+                    cascade_thresholds: List[float] = None, cascade_models: List[str] = None,
+                    transport: FixtureTransport = None) -> AIProvider:
+    """Build the provider for provider_type, optionally as a fast-then-strong cascade.
+
+    cascade_models overrides the provider's fast and strong models; None
+    entries keep the default for their tier.
+    """
+    if provider_type not in PROVIDERS:
+        raise ValueError(f"Unsupported AI provider: {provider_type}")
+    provider_class = PROVIDERS[provider_type]
+    if not cascade:
+        provider = provider_class(api_key)
+        provider.transport = transport
+        return provider
+    thresholds = cascade_thresholds or [0.8]
+    models = [provider_class.FAST_MODEL, provider_class.STRONG_MODEL]
+    for tier, model in enumerate((cascade_models or [])[:len(models)]):
+        models[tier] = model or models[tier]
+    tiers = []
+    for model, threshold in zip(models, thresholds + [0.0]):
+        provider = provider_class(api_key, model=model)
+        provider.transport = transport
+        tiers.append(CascadeTier(provider, threshold))
+    return CascadeProvider(tiers)
+
 class ClaudeFileOrganizer:
-    def __init__(self, api_key: str, source_dir: Path, provider_type: str = "claude"):
+    def __init__(self, api_key: str, source_dir: Path, provider_type: str = "claude",
+                 analyzers: List[FileAnalyzer] = None, analysis_workers: int = None,
+                 incremental: bool = True, index_dir: Path = None,
+                 file_filter: FileFilter = None, recursive: bool = False,
+                 rate_limit_delay: float = 5.0,
+                 create_backup: bool = False, cluster_filenames: bool = True,
+                 cascade: bool = False, cascade_thresholds: List[float] = None,
+                 cascade_models: List[str] = None, transport: FixtureTransport = None, layout: LayoutPolicy = None,
+                 network_mode: bool = False, metadata_workers: int = 32,
+                 priority: Union[str, ScoreFunction] = "scan", rate_share: RateShare = None,
+                 keep_unsorted: bool = False, analysis_pool: AnalysisPool = None,
+                 prefetcher: MetadataPrefetcher = None):
         """Initialize the File Organizer."""
         self.source_dir = source_dir
         self.organized_dir = self.source_dir / "organized"
+        self.analyzers = analyzers or []
+        self.analysis_workers = analysis_workers
+        self.incremental = incremental
+        # Where snapshot indexes are kept; defaults to a per-user data directory
+        self.index_dir = index_dir
+        self.file_filter = file_filter or FileFilter()
+        self.recursive = recursive
+        self.rate_limit_delay = rate_limit_delay
+        # Set by JobScheduler: request slots come from a budget shared with other jobs
+        self.rate_share = rate_share
+        self.create_backup = create_backup
+        self.cluster_filenames = cluster_filenames
+        # Leave files classified as "other" where they are, for manual sorting
+        self.keep_unsorted = keep_unsorted
+        self.layout = layout or LayoutPolicy()
+        self.network_mode = network_mode
+        self.metadata_workers = metadata_workers
+        # Set by JobScheduler: worker pools shared by all jobs, which the
+        # organizer uses instead of starting (and shutting down) its own
+        self.analysis_pool = analysis_pool
+        if analysis_pool is not None:
+            self.analyzers = analysis_pool.analyzers
+        self.prefetcher = prefetcher
+        self.scheduler = PriorityScheduler(priority)
         
         # Initialize AI provider
-        if provider_type == "claude":
-            self.ai_provider = ClaudeProvider(api_key)
-        elif provider_type == "openai":
-            self.ai_provider = OpenAIProvider(api_key)
-        elif provider_type == "groq":
-            self.ai_provider = GroqProvider(api_key)
-        else:
-            raise ValueError(f"Unsupported AI provider: {provider_type}")
+        self.transport = transport
+        self.ai_provider = create_provider(provider_type, api_key, cascade=cascade,
+                                           cascade_thresholds=cascade_thresholds,
+                                           cascade_models=cascade_models, transport=transport)
         
         # Setup logging
         logging.basicConfig(
@@ -138,9 +343,9 @@ class ClaudeFileOrganizer:
         )
         self.logger = logging.getLogger(__name__)
 
-    def get_file_info(self, file_path: Path) -> Dict:
+    def get_file_info(self, file_path: Path, stats: os.stat_result = None) -> Dict:
         """Get file information including type, size, and creation date."""
-        stats = file_path.stat()
+        stats = stats or file_path.stat()
         mime_type, _ = mimetypes.guess_type(file_path)
         
         return {
@@ -151,77 +356,286 @@ class ClaudeFileOrganizer:
             "mime_type": mime_type or "unknown"
         }
 
-    def classify_file(self, file_info: Dict) -> str:
+    def classify_file(self, file_info: Dict, cancel_token: CancellationToken = None) -> str:
+        return self.classify_with_source(file_info, cancel_token)[0]
+
+    def classify_with_source(self, file_info: Dict,
+                             cancel_token: CancellationToken = None) -> Tuple[str, str, Optional[str]]:
+        """Classify a file and report (category, decision source, error message)."""
         try:
-            return self.ai_provider.classify_file(file_info)
+            if cancel_token:
+                category = cancel_token.run(self.ai_provider.classify_file, file_info)
+            else:
+                category = self.ai_provider.classify_file(file_info)
+            return category, self.ai_provider.last_source, None
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error classifying file {file_info['name']}: {str(e)}")
-            return "other"
+            return "other", "llm", str(e)
 
     def organize_files(self, progress_callback: Callable[[int], None] = None,
                       file_callback: Callable[[str], None] = None,
                       pause_check: Callable[[], bool] = None,
-                      cancel_check: Callable[[], bool] = None):
-        """Main method to organize files using AI classification."""
+                      cancel_check: Callable[[], bool] = None,
+                      cancel_token: CancellationToken = None,
+                      result_callback: Callable[[Dict], None] = None):
+        """Main method to organize files using AI classification.
+
+        Pass a cancel_token for immediate cancellation: rate-limit waits and
+        provider requests are interrupted as soon as it is cancelled. The
+        pause_check/cancel_check callbacks are still polled for older callers.
+        result_callback receives one dict per file with its name, category,
+        decision source and error message (None on success).
+        """
+        token = cancel_token or CancellationToken()
+        run_started = time.monotonic()
+        abort_requests = token.on_cancel(self.ai_provider.close)
+        # Wait for the rate limit before every provider request, including escalations
+        self.ai_provider.set_request_hook(lambda: self._rate_limit_wait(token, cancel_check))
+        index = None
+        backup = None
+        clusterer = FilenameClusterer() if self.cluster_filenames else None
+        # Network filesystem mode: concurrent metadata calls and cached destination listings
+        prefetcher = None
+        if self.network_mode:
+            prefetcher = self.prefetcher or MetadataPrefetcher(self.metadata_workers)
+        existence = ExistenceCache() if self.network_mode else None
+        known_dirs = set()
+        pool = None
+        analyzed = None
+        seen_hashes: Dict[str, str] = {}
+        files = []
+        total_files = 0
+        processed_files = 0
+        cancelled = False
+
+        def finish(result: Dict):
+            # Counted once a file is done, so one interrupted by cancel is still left over
+            nonlocal processed_files
+            processed_files += 1
+            if progress_callback:
+                progress_callback(int((processed_files / total_files) * 100))
+            if result_callback:
+                result_callback(result)
+
         try:
             # Create organized directory if it doesn't exist
             self.organized_dir.mkdir(exist_ok=True)
+            self.layout.reset()
             
-            # Get list of files
-            files = [f for f in self.source_dir.iterdir() 
-                    if f.is_file() and f != "file_organizer.log" 
-                    and not str(f).startswith(str(self.organized_dir))]
+            # Get list of files, pruning excluded entries before they are stat'd
+            matcher = self.file_filter.compile(
+                reserved_names=["file_organizer.log"],
+                reserved_dirs=[self.organized_dir, self.source_dir / BACKUP_DIRNAME]
+            )
+            stats = dict(scan(self.source_dir, matcher, recursive=self.recursive, prefetcher=prefetcher))
+            files = list(stats)
+
+            # Only look at entries that are new or changed since the last run
+            if self.incremental:
+                index = SnapshotIndex(self.source_dir, index_dir=self.index_dir)
+                files = index.diff(files, stats)
+                self.logger.info(f"Snapshot index: {len(files)} new or changed files")
             
             if not files:
                 return
 
+            # Ordered by the priority policy, so the files users care about go first
+            files = self.scheduler.order(files, stats)
             total_files = len(files)
-            processed_files = 0
+
+            # Links or clones only, so this costs metadata operations, not copies
+            if self.create_backup:
+                backup = BackupSnapshot.create(self.source_dir, files, stats=stats)
+                self.logger.info(f"Backup snapshot saved to {backup.snapshot_dir}")
+            if prefetcher:
+                category_dirs = [self.organized_dir / c for c in CATEGORIES]
+                prefetcher.make_dirs(category_dirs)
+                known_dirs.update(category_dirs)
+                existence.prefetch(category_dirs, prefetcher)
+
+            # Files shuffled by a rebalance are journaled so restore can follow them
+            self.layout.on_move = backup.record_move if backup else None
+
+            # CPU-bound analysis runs in worker processes, off the GIL, a few
+            # chunks ahead of the loop below
+            if self.analyzers:
+                pool = self.analysis_pool or AnalysisPool(self.analyzers, max_workers=self.analysis_workers)
+                pool.start()
+                analyzed = pool.imap(files, cancel_check=lambda: token.cancelled or
+                                     bool(cancel_check and cancel_check()))
+            else:
+                analyzed = ((file_path, None) for file_path in files)
             
-            for file_path in files:
+            for file_path, analysis in analyzed:
                 try:
                     # Check for cancellation
-                    if cancel_check and cancel_check():
-                        return
+                    self._check_cancelled(token, cancel_check)
 
                     # Check for pause
+                    token.wait_if_paused()
                     while pause_check and pause_check():
-                        time.sleep(0.1)
-                        if cancel_check and cancel_check():
-                            return
-
-                    # Sleep to avoid rate limiting
-                    time.sleep(5)
-                    
-                    # Update progress
-                    processed_files += 1
-                    if progress_callback:
-                        progress_callback(int((processed_files / total_files) * 100))
+                        token.wait(0.1)
+                        self._check_cancelled(token, cancel_check)
                     
                     if file_callback:
                         file_callback(file_path.name)
                     
                     # Get file information and classify
-                    file_info = self.get_file_info(file_path)
-                    category = self.classify_file(file_info)
+                    file_info = self.get_file_info(file_path, stats[file_path])
+                    if analysis:
+                        file_info["analysis"] = analysis
+                        if file_info["mime_type"] == "unknown" and analysis.get("sniffed_type"):
+                            file_info["mime_type"] = analysis["sniffed_type"]
+
+                    # Copies of a file already organized in this run follow the first copy
+                    category = seen_hashes.get(analysis.get("hash")) if analysis else None
+                    if category is not None:
+                        source, classify_error = "duplicate", None
+                    # Reuse the answer given for files of the same name family
+                    elif clusterer and (category := clusterer.assign(file_info)) is not None:
+                        source, classify_error = "cluster", None
+                    else:
+                        category, source, classify_error = self.classify_with_source(file_info, token)
+                        if clusterer and classify_error is None and not clusterer.observe(file_info, category):
+                            self.logger.info(f"Cluster check failed on {file_path.name}; "
+                                             f"classifying its name family file by file")
                     
+                    if classify_error is not None:
+                        # A failed request says nothing about the file: leave it for the next
+                        # run without counting it against the file
+                        if index:
+                            index.record(file_path, "error", counted=False)
+                        finish({"name": file_path.name, "category": None,
+                                "source": source, "error": classify_error})
+                        continue
+
+                    if category == "other" and self.keep_unsorted:
+                        if index:
+                            index.record(file_path, "kept")
+                        self.logger.info(f"Left {file_path.name} in place")
+                        finish({"name": file_path.name, "category": "other (kept)",
+                                "source": source, "error": None})
+                        continue
+
                     # Create category directory
                     category_dir = self.organized_dir / category
-                    category_dir.mkdir(exist_ok=True)
+                    if category_dir not in known_dirs:
+                        category_dir.mkdir(exist_ok=True)
+                        known_dirs.add(category_dir)
+                    new_path = self._free_path(category_dir, file_path, stats[file_path].st_mtime, existence)
                     
                     # Move file
-                    new_path = category_dir / file_path.name
-                    if new_path.exists():
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        new_path = category_dir / f"{file_path.stem}_{timestamp}{file_path.suffix}"
-                    
                     shutil.move(str(file_path), str(new_path))
-                    self.logger.info(f"Moved {file_path.name} to {category}")
+                    self.layout.placed(new_path.parent)
+                    if existence:
+                        existence.add(new_path)
+                    if new_path.name != file_path.name:
+                        self.logger.info(f"Moved {file_path.name} to {category} as {new_path.name}")
+                    else:
+                        self.logger.info(f"Moved {file_path.name} to {category}")
+                    if backup:
+                        backup.record_move(file_path, new_path)
+                    if analysis and analysis.get("hash"):
+                        seen_hashes.setdefault(analysis["hash"], category)
+                    if index:
+                        index.record(file_path, "moved")
+                    finish({"name": file_path.name, "category": category,
+                            "source": source, "error": None})
                     
+                except OperationCancelled:
+                    raise
                 except Exception as e:
                     self.logger.error(f"Error processing file {file_path}: {str(e)}")
+                    if index and index.record(file_path, "error") == "failed":
+                        self.logger.warning(f"Leaving {file_path.name} in place until it changes; "
+                                            f"it failed {index.max_attempts} times")
+                    finish({"name": file_path.name, "category": None,
+                            "source": None, "error": str(e)})
                     continue
+            # The analysis stops early on cancel
+            self._check_cancelled(token, cancel_check)
+
+            if clusterer:
+                self.logger.info(f"Filename clustering: {clusterer.stats()}")
+            if isinstance(self.ai_provider, CascadeProvider):
+                self.logger.info(f"Provider cascade: {self.ai_provider.stats()}")
+            if self.transport:
+                # Separates the organizer's own overhead from (recorded) network time
+                self.logger.info(f"Transport: {self.transport.stats()}, "
+                                 f"run took {time.monotonic() - run_started:.3f} s")
             
+        except OperationCancelled:
+            # Files not yet moved stay unrecorded in the snapshot index, so the
+            # next run picks them up again.
+            cancelled = True
         except Exception as e:
             self.logger.error(f"Error during organization process: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            if analyzed is not None:
+                analyzed.close()
+            if pool and pool is not self.analysis_pool:
+                # Chunks still being analyzed are abandoned rather than awaited on cancel
+                pool.shutdown(wait=not token.cancelled)
+            if prefetcher and prefetcher is not self.prefetcher:
+                prefetcher.shutdown()
+            self.layout.on_move = None
+            self.ai_provider.set_request_hook(None)
+            token.remove_callback(abort_requests)
+            if index:
+                index.close()
+            if backup:
+                backup.close()
+
+        if cancelled:
+            # Measured after cleanup: this is when the caller gets control back
+            remaining = len(files) - processed_files
+            latency = token.latency_ms()
+            latency_note = f" after {latency:.0f} ms" if latency is not None else ""
+            self.logger.info(f"Organization cancelled{latency_note}; {remaining} files left for the next run")
+
+    def _free_path(self, category_dir: Path, file_path: Path, timestamp: float,
+                   existence: ExistenceCache = None) -> Path:
+        """First destination for file_path that is not taken yet.
+
+        A recursive run can bring several files of the same name, so taken
+        names get a counter (report_1.pdf, report_2.pdf, ...). Each candidate
+        goes to the layout directory for its own name, where lookup() finds it.
+        """
+        exists = existence.exists if existence else Path.exists
+        name = file_path.name
+        attempt = 0
+        while True:
+            new_path = self.layout.directory_for(category_dir, name, timestamp) / name
+            if not exists(new_path):
+                return new_path
+            attempt += 1
+            name = f"{file_path.stem}_{attempt}{file_path.suffix}"
+
+    def find_organized_file(self, name: str, category: str = None) -> Optional[Path]:
+        """Where a file named name ended up under the organized directory."""
+        return self.layout.lookup(self.organized_dir, name, category)
+
+    def _check_cancelled(self, token: CancellationToken, cancel_check: Callable[[], bool] = None):
+        if cancel_check and cancel_check():
+            token.cancel()
+        token.raise_if_cancelled()
+
+    def _rate_limit_wait(self, token: CancellationToken, cancel_check: Callable[[], bool] = None):
+        """Sleep between requests, waking up immediately on cancellation."""
+        if self.transport and self.transport.mode == "replay":
+            # Replayed responses never reach the provider's rate limit
+            return
+        if self.rate_share is not None:
+            self.rate_share.wait(token)
+            return
+        if not cancel_check:
+            token.wait(self.rate_limit_delay)
+            return
+        # Legacy callers can only be polled
+        deadline = time.monotonic() + self.rate_limit_delay
+        while (remaining := deadline - time.monotonic()) > 0:
+            token.wait(min(remaining, 0.1))
+            self._check_cancelled(token, cancel_check)
\ No newline at end of file
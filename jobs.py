@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+from analysis_pool import AnalysisPool
+from cancellation import CancellationToken, OperationCancelled
+from file_organizer import ClaudeFileOrganizer
+from netfs import MetadataPrefetcher
+from rate_budget import RateBudget, RateShare
+from transport import FixtureTransport
+
+class Job:
+    """One source directory organized as part of a JobScheduler run."""
+    STATES = ("queued", "running", "done", "cancelled", "failed")
+
+    def __init__(self, job_id: int, source_dir: Path, weight: float, share: RateShare,
+                 organizer_kwargs: Dict):
+        self.id = job_id
+        self.source_dir = Path(source_dir)
+        self.share = share
+        self.organizer_kwargs = organizer_kwargs
+        self.token = CancellationToken()
+        self.status = "queued"
+        self.progress = 0
+        self.processed = 0
+        self.errors = 0
+        self.error: Optional[str] = None
+        self.organizer = None
+
+    @property
+    def weight(self) -> float:
+        return self.share.weight
+
+    @weight.setter
+    def weight(self, value: float):
+        if value <= 0:
+            raise ValueError(f"Job weight must be positive, got {value}")
+        self.share.weight = value
+
+    def snapshot(self) -> Dict:
+        return {"id": self.id, "source_dir": str(self.source_dir), "weight": self.weight,
+                "status": self.status, "progress": self.progress, "processed": self.processed,
+                "errors": self.errors, "requests": self.share.granted, "error": self.error}
+
+class JobScheduler:
+    """Organizes many source directories concurrently against one API account.
+
+    Every job runs its own ClaudeFileOrganizer on a thread; instead of each
+    sleeping rate_limit_delay between requests, they draw request slots from
+    a shared RateBudget in proportion to their weights. Organizer options
+    given here apply to all jobs and can be overridden per job in add().
+    Content analysis and network-mode metadata calls also go through one
+    process pool and one thread pool for all jobs, sized as for a single
+    organizer, so many jobs do not multiply the worker count.
+    """
+
+    def __init__(self, api_key: str, provider_type: str = "claude",
+                 rate_limit_delay: float = 5.0, max_concurrent: Optional[int] = None,
+                 transport: FixtureTransport = None,
+                 job_callback: Callable[[Job], None] = None,
+                 result_callback: Callable[[Job, Dict], None] = None,
+                 **organizer_kwargs):
+        self.api_key = api_key
+        self.provider_type = provider_type
+        self.max_concurrent = max_concurrent
+        self.transport = transport
+        self.job_callback = job_callback
+        self.result_callback = result_callback
+        self.organizer_kwargs = organizer_kwargs
+        self.budget = RateBudget(rate_limit_delay)
+        self.jobs: List[Job] = []
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.analysis_pool: Optional[AnalysisPool] = None
+        self.prefetcher: Optional[MetadataPrefetcher] = None
+        self.futures = []
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, source_dir: Path, weight: float = 1.0, **organizer_kwargs) -> Job:
+        if self.executor is not None:
+            raise RuntimeError("Jobs must be added before the scheduler is started")
+        job = Job(len(self.jobs), source_dir, weight,
+                  self.budget.share(weight, name=str(source_dir)),
+                  {**self.organizer_kwargs, **organizer_kwargs})
+        self.jobs.append(job)
+        return job
+
+    def _notify(self, job: Job):
+        if self.job_callback:
+            self.job_callback(job)
+
+    def _on_result(self, job: Job, result: Dict):
+        job.processed += 1
+        if result.get("error"):
+            job.errors += 1
+        if self.result_callback:
+            self.result_callback(job, result)
+
+    def _on_progress(self, job: Job, percent: int):
+        job.progress = percent
+        self._notify(job)
+
+    def _run_job(self, job: Job):
+        if job.token.cancelled:
+            job.status = "cancelled"
+            self._notify(job)
+            return
+        job.status = "running"
+        self._notify(job)
+        shared = {}
+        # Jobs that override the analyzers run them in a pool of their own
+        if self.analysis_pool and job.organizer_kwargs.get("analyzers") is self.analysis_pool.analyzers:
+            shared["analysis_pool"] = self.analysis_pool
+        if self.prefetcher and job.organizer_kwargs.get("network_mode"):
+            shared["prefetcher"] = self.prefetcher
+        try:
+            job.organizer = ClaudeFileOrganizer(
+                api_key=self.api_key, source_dir=job.source_dir,
+                provider_type=self.provider_type, transport=self.transport,
+                rate_share=job.share, **shared, **job.organizer_kwargs)
+            job.organizer.organize_files(
+                progress_callback=lambda percent: self._on_progress(job, percent),
+                cancel_token=job.token,
+                result_callback=lambda result: self._on_result(job, result))
+            if job.token.cancelled:
+                job.status = "cancelled"
+            else:
+                job.status = "done"
+                job.progress = 100
+        except OperationCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            self.logger.error(f"Job {job.id} ({job.source_dir}) failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        self._notify(job)
+
+    def start(self):
+        """Start all jobs; returns immediately."""
+        if self.executor is not None:
+            raise RuntimeError("The scheduler has already been started")
+        if self.organizer_kwargs.get("analyzers"):
+            self.analysis_pool = AnalysisPool(self.organizer_kwargs["analyzers"],
+                                              max_workers=self.organizer_kwargs.get("analysis_workers"))
+            self.analysis_pool.start()
+        if any(job.organizer_kwargs.get("network_mode") for job in self.jobs):
+            self.prefetcher = MetadataPrefetcher(self.organizer_kwargs.get("metadata_workers", 32))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent or max(len(self.jobs), 1),
+                                           thread_name_prefix="job")
+        self.futures = [self.executor.submit(self._run_job, job) for job in self.jobs]
+
+    def wait(self) -> List[Job]:
+        """Block until every job has finished, failed or been cancelled."""
+        for future in self.futures:
+            future.result()
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.analysis_pool:
+            # Chunks of cancelled jobs may still be running; they are not waited for
+            self.analysis_pool.shutdown(wait=not any(job.token.cancelled for job in self.jobs))
+            self.analysis_pool = None
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+            self.prefetcher = None
+        self.logger.info(f"Jobs finished, {self.budget.granted} provider requests: " +
+                         ", ".join(f"{job.source_dir.name} {job.share.granted} (weight {job.weight:g})"
+                                   for job in self.jobs))
+        return self.jobs
+
+    def run(self) -> List[Job]:
+        self.start()
+        return self.wait()
+
+    def _selected(self, job_id: Optional[int]) -> List[Job]:
+        return self.jobs if job_id is None else [self.jobs[job_id]]
+
+    def cancel(self, job_id: Optional[int] = None):
+        """Cancel one job, or all of them. Never blocks on the running jobs."""
+        for job in self._selected(job_id):
+            job.token.cancel()
+
+    def pause(self, job_id: Optional[int] = None):
+        for job in self._selected(job_id):
+            job.token.pause()
+
+    def resume(self, job_id: Optional[int] = None):
+        for job in self._selected(job_id):
+            job.token.resume()
@@ -0,0 +1,134 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+import hashlib
+import os
+
+class LayoutPolicy:
+    """Decides where inside a category directory a file is placed.
+
+    `flat` puts everything directly in the category (the classic layout).
+    `hash` starts flat and, once a directory passes max_entries, splits it
+    into subdirectories named by the next two hex digits of a hash of the
+    file name, recursively. `date` always files by YYYY/MM first and splits
+    months that pass max_entries the same way. Split directories carry a
+    marker file so the layout can be walked back by lookup().
+    """
+    SCHEMES = ("flat", "hash", "date")
+    MARKER = ".fanout"
+    # A split directory holds up to 256 children plus the marker, so smaller
+    # limits could not be kept
+    MIN_ENTRIES = 257
+
+    def __init__(self, scheme: str = "flat", max_entries: int = 10000,
+                 on_move: Callable[[Path, Path], None] = None):
+        if scheme not in self.SCHEMES:
+            raise ValueError(f"Unsupported layout scheme: {scheme}")
+        self.scheme = scheme
+        self.max_entries = max(max_entries, self.MIN_ENTRIES)
+        self.on_move = on_move
+        # Only the organizer writes to the tree during a run, so directory
+        # state is cached instead of re-checked for every file.
+        self._counts: Dict[Path, int] = {}
+        self._split: Dict[Path, bool] = {}
+        self._known_dirs: Set[Path] = set()
+
+    def reset(self):
+        """Forget cached directory state, e.g. before a new run."""
+        self._counts.clear()
+        self._split.clear()
+        self._known_dirs.clear()
+
+    @staticmethod
+    def name_hash(name: str) -> str:
+        return hashlib.blake2b(name.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _is_split(self, directory: Path) -> bool:
+        if directory not in self._split:
+            self._split[directory] = (directory / self.MARKER).exists()
+        return self._split[directory]
+
+    def _ensure_dir(self, directory: Path):
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+
+    def _leaf(self, directory: Path, name: str) -> Path:
+        """Walk split directories down to the one that holds name."""
+        digest = self.name_hash(name)
+        depth = 0
+        while self._is_split(directory) and depth * 2 < len(digest):
+            directory = directory / digest[depth * 2:depth * 2 + 2]
+            depth += 1
+        return directory
+
+    def _count(self, directory: Path) -> int:
+        if directory not in self._counts:
+            try:
+                with os.scandir(directory) as entries:
+                    self._counts[directory] = sum(1 for e in entries if e.name != self.MARKER)
+            except FileNotFoundError:
+                self._counts[directory] = 0
+        return self._counts[directory]
+
+    def directory_for(self, category_dir: Path, name: str, timestamp: float = None) -> Path:
+        """Directory a new file should go to, creating and rebalancing as needed."""
+        if self.scheme == "flat":
+            return category_dir
+        base = category_dir
+        if self.scheme == "date":
+            when = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+            base = category_dir / f"{when:%Y}" / f"{when:%m}"
+        leaf = self._leaf(base, name)
+        self._ensure_dir(leaf)
+        if self._count(leaf) >= self.max_entries:
+            self.rebalance(leaf)
+            leaf = self._leaf(base, name)
+            self._ensure_dir(leaf)
+        return leaf
+
+    def placed(self, directory: Path):
+        """Account for a file just moved into directory."""
+        self._counts[directory] = self._count(directory) + 1
+
+    def rebalance(self, directory: Path):
+        """Split a full leaf directory into hash-prefix subdirectories."""
+        depth = len(directory.relative_to(self._split_root(directory)).parts)
+        children: Dict[Path, int] = {}
+        with os.scandir(directory) as entries:
+            files = [Path(e.path) for e in entries if e.is_file(follow_symlinks=False)]
+        for file_path in files:
+            digest = self.name_hash(file_path.name)
+            child = directory / digest[depth * 2:depth * 2 + 2]
+            if child not in children:
+                self._ensure_dir(child)
+                children[child] = 0
+            target = child / file_path.name
+            os.replace(file_path, target)
+            children[child] += 1
+            if self.on_move:
+                self.on_move(file_path, target)
+        (directory / self.MARKER).touch()
+        self._split[directory] = True
+        self._counts[directory] = 0
+        self._counts.update(children)
+
+    def _split_root(self, directory: Path) -> Path:
+        """Topmost directory of the hash split tree that directory belongs to."""
+        while directory.parent != directory and self._is_split(directory.parent):
+            directory = directory.parent
+        return directory
+
+    def lookup(self, organized_dir: Path, name: str, category: Optional[str] = None) -> Optional[Path]:
+        """Find where a file named name was placed, searching all categories if needed."""
+        categories = [organized_dir / category] if category else \
+            [p for p in organized_dir.iterdir() if p.is_dir()]
+        for category_dir in categories:
+            bases: List[Path] = [category_dir]
+            if self.scheme == "date":
+                bases = sorted(category_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]"), reverse=True)
+            for base in bases:
+                candidate = self._leaf(base, name) / name
+                if candidate.exists():
+                    return candidate
+        return None
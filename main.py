@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -10,8 +11,17 @@ from PyQt6.QtGui import QColor, QPalette, QFont, QIcon, QLinearGradient, QPainte
 from PrivacyDialog import PrivacyDialog
 import configparser
 
+from analysis_pool import ContentSniffAnalyzer, HashAnalyzer
+from backup import BackupSnapshot
+from cancellation import CancellationToken
 from file_organizer import ClaudeFileOrganizer
+from file_filters import FileFilter
+from jobs import JobScheduler
+from JobsPanel import JobsPanel
+from layout import LayoutPolicy
 from ModernWidgets import ModernButton, ModernLineEdit, ModernComboBox, ModernProgressBar
+from ResultsPanel import ResultsPanel
+from transport import transport_from_env
 from SettingsDialog import SettingsDialog
 
 
@@ -28,28 +38,106 @@ def resource_path(relative_path):
 
 icon_path = resource_path("assets/icon.ico")
 
+# Order of the "Process files" choices in SettingsDialog
+PRIORITY_POLICIES = ["scan", "newest", "largest", "smallest", "documents"]
+
 
 class OrganizerWorker(QThread):
     progress = pyqtSignal(int)
     finished = pyqtSignal()
+    cancelled = pyqtSignal()
     error = pyqtSignal(str)
     file_processed = pyqtSignal(str)
+    result = pyqtSignal(dict)
 
     def __init__(self, organizer):
         super().__init__()
         self.organizer = organizer
-        self.is_paused = False
-        self.is_cancelled = False
+        self.cancel_token = CancellationToken()
+
+    @property
+    def is_paused(self):
+        return self.cancel_token.paused
+
+    def pause_run(self):
+        self.cancel_token.pause()
+
+    def resume_run(self):
+        self.cancel_token.resume()
+
+    def cancel_run(self):
+        self.cancel_token.cancel()
 
     def run(self):
         try:
             self.organizer.organize_files(
                 progress_callback=self.progress.emit,
                 file_callback=self.file_processed.emit,
-                pause_check=lambda: self.is_paused,
-                cancel_check=lambda: self.is_cancelled
+                cancel_token=self.cancel_token,
+                result_callback=self.result.emit
             )
-            self.finished.emit()
+            if self.cancel_token.cancelled:
+                self.cancelled.emit()
+            else:
+                self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            if self.organizer.transport:
+                self.organizer.transport.close()
+
+class JobsWorker(QThread):
+    """Runs a JobScheduler over several directories; job_changed carries Job.snapshot() dicts."""
+    job_changed = pyqtSignal(dict)
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+    result = pyqtSignal(dict)
+
+    def __init__(self, scheduler):
+        super().__init__()
+        self.scheduler = scheduler
+        self.paused = False
+        # Signals are safe to emit from the job threads
+        scheduler.job_callback = lambda job: self.job_changed.emit(job.snapshot())
+        scheduler.result_callback = lambda job, result: self.result.emit(
+            {**result, "name": f"{job.source_dir.name}/{result['name']}"})
+
+    @property
+    def is_paused(self):
+        return self.paused
+
+    def pause_run(self):
+        self.paused = True
+        self.scheduler.pause()
+
+    def resume_run(self):
+        self.paused = False
+        self.scheduler.resume()
+
+    def cancel_run(self):
+        self.scheduler.cancel()
+
+    def run(self):
+        try:
+            jobs = self.scheduler.run()
+            self.finished.emit([job.snapshot() for job in jobs])
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            if self.scheduler.transport:
+                self.scheduler.transport.close()
+
+class RestoreWorker(QThread):
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, backup):
+        super().__init__()
+        self.backup = backup
+
+    def run(self):
+        try:
+            self.finished.emit(self.backup.restore())
         except Exception as e:
             self.error.emit(str(e))
 
@@ -148,7 +236,7 @@ class FileOrganizerGUI(QMainWindow):
     def init_ui(self):
         self.setWindowTitle('File Organizer')
         self.setMinimumWidth(700)
-        self.setMinimumHeight(600)
+        self.setMinimumHeight(800)
 
         # Main widget and layout
         main_widget = QWidget()
@@ -199,12 +287,15 @@ class FileOrganizerGUI(QMainWindow):
         dir_label = QLabel('Directory:')
         dir_label.setStyleSheet("font-weight: 500; font-size: 16px; padding-right: 10px;")
         self.dir_input = ModernLineEdit()
-        self.dir_input.setPlaceholderText('Select Directory')
+        self.dir_input.setPlaceholderText('Select Directory (separate several with ;)')
         self.browse_btn = ModernButton('Browse')
         self.browse_btn.clicked.connect(self.browse_directory)
+        self.add_dir_btn = ModernButton('Add')
+        self.add_dir_btn.clicked.connect(self.add_directory)
         dir_layout.addWidget(dir_label)
         dir_layout.addWidget(self.dir_input)
         dir_layout.addWidget(self.browse_btn)
+        dir_layout.addWidget(self.add_dir_btn)
         settings_layout.addLayout(dir_layout)
 
         main_layout.addWidget(settings_card)
@@ -221,8 +312,23 @@ class FileOrganizerGUI(QMainWindow):
         self.status_label.setStyleSheet("color: #8E8E93; font-size: 14px; font-weight: 500;")
         progress_layout.addWidget(self.status_label)
 
+        # Shown for multi-directory runs only
+        self.jobs_panel = JobsPanel()
+        self.jobs_panel.setMaximumHeight(180)
+        self.jobs_panel.hide()
+        self.jobs_panel.cancel_requested.connect(self.cancel_job)
+        self.jobs_panel.weight_changed.connect(self.set_job_weight)
+        progress_layout.addWidget(self.jobs_panel)
+
         main_layout.addWidget(progress_card)
 
+        # Results card
+        results_card = CardFrame()
+        results_layout = QVBoxLayout(results_card)
+        self.results_panel = ResultsPanel()
+        results_layout.addWidget(self.results_panel)
+        main_layout.addWidget(results_card, stretch=1)
+
         # Control buttons
         btn_layout = QHBoxLayout()
         self.start_btn = ModernButton('Start Organization', is_primary=True)
@@ -234,6 +340,10 @@ class FileOrganizerGUI(QMainWindow):
         self.cancel_btn.clicked.connect(self.cancel_organization)
         self.cancel_btn.setEnabled(False)
 
+        self.restore_btn = ModernButton('Undo Last Run')
+        self.restore_btn.clicked.connect(self.restore_backup)
+
+        btn_layout.addWidget(self.restore_btn)
         btn_layout.addStretch()
         btn_layout.addWidget(self.cancel_btn)
         btn_layout.addWidget(self.pause_btn)
@@ -244,10 +354,9 @@ class FileOrganizerGUI(QMainWindow):
         main_layout.addWidget(privacy_notice)
 
         # Add settings button
-        # self.settings_btn = ModernButton('Settings')
-        # self.settings_btn.setIcon(QIcon(resource_path("assets/settings.png")))
-        # self.settings_btn.clicked.connect(self.show_settings)
-        # btn_layout.addWidget(self.settings_btn)
+        self.settings_btn = ModernButton('Settings')
+        self.settings_btn.clicked.connect(self.show_settings)
+        btn_layout.insertWidget(1, self.settings_btn)
         
         main_layout.addLayout(btn_layout)
         main_layout.addStretch()
@@ -282,6 +391,16 @@ class FileOrganizerGUI(QMainWindow):
         if directory:
             self.dir_input.setText(directory)
 
+    def add_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Add Directory")
+        if directory:
+            directories = self.directories()
+            if directory not in directories:
+                self.dir_input.setText('; '.join(directories + [directory]))
+
+    def directories(self):
+        return [d.strip() for d in self.dir_input.text().split(';') if d.strip()]
+
     def start_organization(self):
         if not self.api_key_input.text() or not self.dir_input.text():
             QMessageBox.warning(self, 'Error', 'Please enter both API key and directory')
@@ -295,23 +414,76 @@ class FileOrganizerGUI(QMainWindow):
                 2: "groq"
             }
             provider_type = provider_map[self.provider_combo.currentIndex()]
-            
-            self.organizer = ClaudeFileOrganizer(
-                api_key=self.api_key_input.text(),
-                source_dir=Path(self.dir_input.text()),
-                provider_type=provider_type
+
+            settings = QSettings("FileOrganizer", "Preferences")
+            skip_hidden = settings.value("skip_hidden", True, type=bool)
+            file_filter = FileFilter.from_excluded_types(
+                settings.value("excluded_types", ""),
+                exclude_hidden=skip_hidden,
+                exclude_system=skip_hidden
             )
             
-            self.worker = OrganizerWorker(self.organizer)
-            self.worker.progress.connect(self.update_progress)
-            self.worker.finished.connect(self.organization_finished)
+            options = dict(
+                file_filter=file_filter,
+                recursive=settings.value("recursive", False, type=bool),
+                create_backup=settings.value("create_backup", True, type=bool),
+                cascade=settings.value("cascade", False, type=bool),
+                cascade_thresholds=[settings.value("cascade_threshold", 80, type=int) / 100],
+                network_mode=settings.value("network_mode", False, type=bool),
+                keep_unsorted=settings.value("keep_unsorted", False, type=bool),
+                analyzers=[HashAnalyzer(), ContentSniffAnalyzer()]
+                if settings.value("analyze_contents", False, type=bool) else None,
+                priority=PRIORITY_POLICIES[settings.value("priority", 0, type=int)]
+            )
+
+            def make_layout():
+                # A layout caches directory state for one run, so each directory gets its own
+                return LayoutPolicy(
+                    scheme=LayoutPolicy.SCHEMES[settings.value("layout_scheme", 0, type=int)],
+                    max_entries=settings.value("layout_max_entries", 10000, type=int)
+                )
+
+            directories = self.directories()
+            self.results_panel.clear()
+            self.jobs_panel.clear()
+            if len(directories) > 1:
+                scheduler = JobScheduler(
+                    api_key=self.api_key_input.text(),
+                    provider_type=provider_type,
+                    transport=transport_from_env(),
+                    **options
+                )
+                for directory in directories:
+                    scheduler.add(Path(directory), layout=make_layout())
+                self.worker = JobsWorker(scheduler)
+                self.worker.job_changed.connect(self.update_job)
+                self.worker.finished.connect(self.jobs_finished)
+                self.jobs_panel.set_jobs([job.snapshot() for job in scheduler.jobs])
+                self.jobs_panel.show()
+                self.status_label.setText(f'Organizing {len(directories)} directories')
+            else:
+                self.organizer = ClaudeFileOrganizer(
+                    api_key=self.api_key_input.text(),
+                    source_dir=Path(directories[0]),
+                    provider_type=provider_type,
+                    transport=transport_from_env(),
+                    layout=make_layout(),
+                    **options
+                )
+                self.worker = OrganizerWorker(self.organizer)
+                self.worker.progress.connect(self.update_progress)
+                self.worker.finished.connect(self.organization_finished)
+                self.worker.cancelled.connect(self.reset_ui)
+                self.worker.file_processed.connect(self.update_status)
+                self.jobs_panel.hide()
             self.worker.error.connect(self.show_error)
-            self.worker.file_processed.connect(self.update_status)
+            self.worker.result.connect(self.results_panel.add_result)
             
             self.worker.start()
             self.save_config()
             
             self.start_btn.setEnabled(False)
+            self.restore_btn.setEnabled(False)
             self.pause_btn.setEnabled(True)
             self.cancel_btn.setEnabled(True)
             
@@ -320,15 +492,48 @@ class FileOrganizerGUI(QMainWindow):
 
     def pause_organization(self):
         if self.worker:
-            self.worker.is_paused = not self.worker.is_paused
+            if self.worker.is_paused:
+                self.worker.resume_run()
+            else:
+                self.worker.pause_run()
             self.pause_btn.setText('Resume' if self.worker.is_paused else 'Pause')
             self.status_label.setText('Paused' if self.worker.is_paused else 'Running')
 
     def cancel_organization(self):
+        # The worker reports back through its cancelled signal; never block the GUI thread on it
         if self.worker:
-            self.worker.is_cancelled = True
-            self.worker.wait()
-            self.reset_ui()
+            self.worker.cancel_run()
+            self.pause_btn.setEnabled(False)
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText('Cancelling...')
+
+    def restore_backup(self):
+        if not self.dir_input.text():
+            QMessageBox.warning(self, 'Error', 'Please select a directory')
+            return
+        if len(self.directories()) > 1:
+            QMessageBox.warning(self, 'Undo Last Run', 'Undo works on one directory at a time.')
+            return
+        backup = BackupSnapshot.latest(Path(self.dir_input.text()))
+        if backup is None:
+            QMessageBox.information(self, 'Undo Last Run', 'No backup found for this directory.')
+            return
+
+        self.restore_worker = RestoreWorker(backup)
+        self.restore_worker.finished.connect(self.restore_finished)
+        self.restore_worker.error.connect(self.show_error)
+        self.restore_worker.start()
+        self.start_btn.setEnabled(False)
+        self.restore_btn.setEnabled(False)
+        self.status_label.setText('Restoring...')
+
+    def restore_finished(self, problems):
+        self.reset_ui()
+        if problems:
+            QMessageBox.warning(self, 'Undo Last Run',
+                                f'{len(problems)} files could not be restored:\n' + '\n'.join(problems[:20]))
+        else:
+            QMessageBox.information(self, 'Undo Last Run', 'Files restored to their original locations.')
 
     def update_progress(self, value):
         self.progress_bar.setValue(value)
@@ -336,6 +541,38 @@ class FileOrganizerGUI(QMainWindow):
     def update_status(self, filename):
         self.status_label.setText(f'Processing: {filename}')
 
+    def update_job(self, job):
+        self.jobs_panel.update_job(job)
+        progress = [bar.value() for bar in self.jobs_panel.progress_bars]
+        self.progress_bar.setValue(sum(progress) // max(len(progress), 1))
+
+    def _job_scheduler(self, job_id):
+        """The running JobScheduler, if it has a job with this id."""
+        if isinstance(self.worker, JobsWorker) and job_id < len(self.worker.scheduler.jobs):
+            return self.worker.scheduler
+        return None
+
+    def cancel_job(self, job_id):
+        scheduler = self._job_scheduler(job_id)
+        if scheduler:
+            scheduler.cancel(job_id)
+
+    def set_job_weight(self, job_id, weight):
+        scheduler = self._job_scheduler(job_id)
+        if scheduler:
+            scheduler.jobs[job_id].weight = weight
+
+    def jobs_finished(self, jobs):
+        self.reset_ui()
+        failed = [job for job in jobs if job["status"] == "failed"]
+        cancelled = sum(1 for job in jobs if job["status"] == "cancelled")
+        if failed:
+            QMessageBox.warning(self, 'Finished with errors', '\n'.join(
+                f"{job['source_dir']}: {job['error']}" for job in failed))
+        elif cancelled < len(jobs):
+            QMessageBox.information(self, 'Success',
+                                    f'Organized {len(jobs) - cancelled} of {len(jobs)} directories.')
+
     def organization_finished(self):
         self.reset_ui()
         QMessageBox.information(self, 'Success', 'File organization completed!')
@@ -346,6 +583,7 @@ class FileOrganizerGUI(QMainWindow):
 
     def reset_ui(self):
         self.start_btn.setEnabled(True)
+        self.restore_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
         self.cancel_btn.setEnabled(False)
         self.pause_btn.setText('Pause')
@@ -373,6 +611,8 @@ class FileOrganizerGUI(QMainWindow):
             self.apply_settings()
 
 def main():
+    # Needed for the analysis process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = FileOrganizerGUI()
     window.show()
@@ -0,0 +1,88 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, Set, Tuple, TypeVar
+import os
+import threading
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MetadataPrefetcher:
+    """Runs metadata calls (stat, mkdir, listings) through a bounded thread pool.
+
+    On SMB/NFS every such call is a network round trip; keeping up to
+    `window` of them in flight ahead of the consumer hides most of that
+    latency while results still come back in order.
+    """
+
+    def __init__(self, max_workers: int = 32, window: int = 256):
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metadata")
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> Iterator[Tuple[T, R]]:
+        """Yield (item, fn(item)) in input order, with at most window calls pending.
+
+        Items whose call raises OSError are skipped.
+        """
+        pending: Deque = deque()
+        for item in items:
+            pending.append((item, self.executor.submit(fn, item)))
+            if len(pending) >= self.window:
+                yield from self._pop(pending)
+        while pending:
+            yield from self._pop(pending)
+
+    @staticmethod
+    def _pop(pending: Deque):
+        item, future = pending.popleft()
+        try:
+            yield item, future.result()
+        except OSError:
+            return
+
+    def make_dirs(self, directories: Iterable[Path]):
+        """Create all directories concurrently, once."""
+        list(self.map(lambda d: d.mkdir(parents=True, exist_ok=True), directories))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ExistenceCache:
+    """Answers exists() for destination paths from one listing per directory.
+
+    The organizer is the only writer to its destination tree during a run,
+    so after the first listing the cache is kept current with add() instead
+    of asking the filesystem again.
+    """
+
+    def __init__(self):
+        self._listings: Dict[Path, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _listing(self, directory: Path) -> Set[str]:
+        with self._lock:
+            names = self._listings.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {e.name for e in entries}
+            except FileNotFoundError:
+                names = set()
+            with self._lock:
+                names = self._listings.setdefault(directory, names)
+        return names
+
+    def prefetch(self, directories: Iterable[Path], prefetcher: MetadataPrefetcher):
+        """List several destination directories in parallel ahead of use."""
+        for _ in prefetcher.map(self._listing, directories):
+            pass
+
+    def exists(self, path: Path) -> bool:
+        return path.name in self._listing(path.parent)
+
+    def add(self, path: Path):
+        with self._lock:
+            # A directory that was never listed will include path when it is
+            if path.parent in self._listings:
+                self._listings[path.parent].add(path.name)
@@ -0,0 +1,73 @@
+from typing import List
+import threading
+import time
+
+from cancellation import CancellationToken
+
+class RateShare:
+    """One job's claim on a RateBudget; weight may be changed while running."""
+
+    def __init__(self, budget: "RateBudget", weight: float, name: str = ""):
+        self.budget = budget
+        self.weight = weight
+        self.name = name
+        self.pass_value = 0.0
+        self.granted = 0
+
+    def wait(self, token: CancellationToken):
+        """Block until this job may send its next provider request."""
+        self.budget.acquire(self, token)
+
+class RateBudget:
+    """Shares one provider rate limit between concurrent jobs by weight.
+
+    The budget hands out one request slot every `interval` seconds in total.
+    Each slot goes to the waiting job that has had the least service for its
+    weight (stride scheduling): busy jobs get slots in proportion to their
+    weights, a huge job cannot starve small ones, and slots a job does not
+    claim go to the others instead of being lost.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._waiting: List[RateShare] = []
+        self._next_slot = 0.0
+        # Pass value of the last granted slot; joining jobs start here so
+        # idle time is not banked as credit against the busy ones
+        self._virtual_time = 0.0
+        self.granted = 0
+
+    def share(self, weight: float = 1.0, name: str = "") -> RateShare:
+        if weight <= 0:
+            raise ValueError(f"Job weight must be positive, got {weight}")
+        return RateShare(self, weight, name)
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def acquire(self, share: RateShare, token: CancellationToken):
+        wake = token.on_cancel(self._wake)
+        try:
+            with self._cond:
+                share.pass_value = max(share.pass_value, self._virtual_time)
+                self._waiting.append(share)
+                try:
+                    while True:
+                        token.raise_if_cancelled()
+                        now = time.monotonic()
+                        first = min(self._waiting, key=lambda s: s.pass_value)
+                        if first is share and now >= self._next_slot:
+                            break
+                        self._cond.wait(self._next_slot - now if now < self._next_slot else None)
+                finally:
+                    self._waiting.remove(share)
+                    self._cond.notify_all()
+                self._virtual_time = share.pass_value
+                share.pass_value += 1.0 / share.weight
+                share.granted += 1
+                self.granted += 1
+                self._next_slot = now + self.interval
+        finally:
+            token.remove_callback(wake)
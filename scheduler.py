@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+import os
+
+# Lower score = processed earlier
+ScoreFunction = Callable[[Path, os.stat_result], float]
+
+EXTENSION_GROUPS: Dict[str, List[str]] = {
+    "documents": [".pdf", ".doc", ".docx", ".odt", ".rtf", ".txt", ".md", ".pages",
+                  ".xls", ".xlsx", ".csv", ".ppt", ".pptx", ".key"],
+    "images": [".jpg", ".jpeg", ".png", ".gif", ".heic", ".webp", ".svg", ".bmp", ".tiff"],
+    "audio": [".mp3", ".wav", ".flac", ".m4a", ".aac", ".ogg"],
+    "video": [".mp4", ".mov", ".mkv", ".avi", ".webm"],
+    "archives": [".zip", ".tar", ".gz", ".7z", ".rar", ".dmg", ".iso"],
+}
+
+def extension_group_score(group_order: List[str]) -> ScoreFunction:
+    """Score files by the position of their extension group in group_order."""
+    ranks = {}
+    for rank, group in enumerate(group_order):
+        for extension in EXTENSION_GROUPS.get(group, [group]):
+            ranks.setdefault(extension.lower(), rank)
+    unranked = len(group_order)
+    return lambda path, stats: ranks.get(path.suffix.lower(), unranked)
+
+POLICIES: Dict[str, ScoreFunction] = {
+    "newest": lambda path, stats: -stats.st_mtime,
+    "oldest": lambda path, stats: stats.st_mtime,
+    "largest": lambda path, stats: -stats.st_size,
+    "smallest": lambda path, stats: stats.st_size,
+    "documents": extension_group_score(["documents", "images", "archives", "audio", "video"]),
+}
+
+class PriorityScheduler:
+    """Orders the work queue so the most useful files are organized first.
+
+    The order is exact: the organizer already holds the full listing for
+    the index diff, backup and progress total, so sorting it costs no
+    extra memory. Files with equal scores keep their scan order.
+    """
+
+    def __init__(self, policy: Union[str, ScoreFunction] = "scan"):
+        if callable(policy):
+            self.score = policy
+        elif policy == "scan":
+            self.score = None
+        elif policy in POLICIES:
+            self.score = POLICIES[policy]
+        else:
+            raise ValueError(f"Unsupported priority policy: {policy}")
+
+    def order(self, files: List[Path], stats: Dict[Path, os.stat_result]) -> List[Path]:
+        if self.score is None:
+            return files
+        return sorted(files, key=lambda path: self.score(path, stats[path]))
@@ -0,0 +1,139 @@
+from pathlib import Path
+from typing import List, Dict, Iterable, Optional, Tuple
+import hashlib
+import os
+import sqlite3
+import sys
+
+# (inode, size, mtime_ns) identifying one version of a directory entry
+EntryKey = Tuple[int, int, int]
+
+class SnapshotIndex:
+    """Persistent per-directory record of what each entry looked like and
+    what the organizer did with it.
+
+    A run diffs the current scan against the index and only processes entries
+    that are new, changed since they were recorded, or whose last outcome is
+    worth retrying. Outcomes are `moved`, `kept` (deliberately left in
+    place), `error` (retried) and `failed` (an entry whose own processing,
+    e.g. the move, errored max_attempts times in a row without it changing;
+    left alone until it does).
+    """
+    # A moved file that is back at its old path was restored, so look at it again
+    RETRY_OUTCOMES = {"error", "moved"}
+
+    def __init__(self, directory: Path, index_dir: Optional[Path] = None, commit_every: int = 500,
+                 max_attempts: int = 3):
+        self.directory = directory
+        self.index_path = self.index_path_for(directory, index_dir)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self.max_attempts = max_attempts
+        self._pending = 0
+        self._current: Dict[str, EntryKey] = {}
+        # Earlier failed attempts of unchanged entries, by name
+        self._attempts: Dict[str, int] = {}
+        self.conn = sqlite3.connect(str(self.index_path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                name TEXT PRIMARY KEY,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                outcome TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(entries)")}
+        if "attempts" not in columns:
+            # Index written before failed attempts were counted
+            self.conn.execute("ALTER TABLE entries ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @staticmethod
+    def default_index_dir() -> Path:
+        """Per-user local data directory the indexes are kept in."""
+        if os.name == "nt":
+            base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+        elif sys.platform == "darwin":
+            base = Path.home() / "Library" / "Application Support"
+        else:
+            base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share")
+        return base / "FileOrganizer" / "indexes"
+
+    @classmethod
+    def index_path_for(cls, directory: Path, index_dir: Optional[Path] = None) -> Path:
+        """Index file for directory, named by a hash of its absolute path.
+
+        Indexes live on the local disk rather than in the organized directory:
+        SQLite locking is unreliable on SMB/NFS mounts.
+        """
+        key = os.fsencode(str(Path(directory).resolve()))
+        digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+        return (index_dir or cls.default_index_dir()) / f"{digest}.db"
+
+    @staticmethod
+    def entry_key(path: Path, stats: os.stat_result = None) -> EntryKey:
+        stats = stats or path.stat()
+        return (stats.st_ino, stats.st_size, stats.st_mtime_ns)
+
+    def load(self) -> Dict[str, Tuple[EntryKey, str, int]]:
+        rows = self.conn.execute("SELECT name, inode, size, mtime_ns, outcome, attempts FROM entries")
+        return {name: ((inode, size, mtime_ns), outcome, attempts)
+                for name, inode, size, mtime_ns, outcome, attempts in rows}
+
+    def entry_name(self, file_path: Path) -> str:
+        """Entries are keyed by their path relative to the indexed directory."""
+        return file_path.relative_to(self.directory).as_posix()
+
+    def diff(self, files: Iterable[Path], stats: Dict[Path, os.stat_result] = None) -> List[Path]:
+        """Return the files that need processing and drop rows for entries that are gone."""
+        known = self.load()
+        changed = []
+        for file_path in files:
+            name = self.entry_name(file_path)
+            key = self.entry_key(file_path, stats.get(file_path) if stats else None)
+            self._current[name] = key
+            previous = known.pop(name, None)
+            if previous is None or previous[0] != key:
+                changed.append(file_path)
+            elif previous[1] in self.RETRY_OUTCOMES:
+                changed.append(file_path)
+                if previous[1] == "error":
+                    self._attempts[name] = previous[2]
+
+        if known:
+            self.conn.executemany("DELETE FROM entries WHERE name = ?", [(name,) for name in known])
+            self.conn.commit()
+        return changed
+
+    def record(self, file_path: Path, outcome: str, counted: bool = True) -> str:
+        """Remember the outcome for an entry seen by the last diff().
+
+        Returns the outcome stored, which is `failed` instead of `error` once
+        an unchanged entry has run out of attempts. Errors that say nothing
+        about the entry itself, such as a failed provider request, pass
+        counted=False: the entry is retried without using up an attempt.
+        """
+        name = self.entry_name(file_path)
+        key = self._current.get(name)
+        if key is None:
+            return outcome
+        attempts = 0
+        if outcome == "error":
+            attempts = self._attempts.get(name, 0) + (1 if counted else 0)
+            if attempts >= self.max_attempts:
+                outcome = "failed"
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (name, inode, size, mtime_ns, outcome, attempts) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, *key, outcome, attempts)
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+        return outcome
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
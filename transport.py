@@ -0,0 +1,116 @@
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+class ReplayMiss(Exception):
+    """Raised in strict replay when a request was never recorded."""
+    pass
+
+class FixtureTransport:
+    """Records provider request/response pairs to a fixture, or replays them.
+
+    Fixtures are gzip'd JSON lines holding a hash of the provider, model and
+    prompt, the raw response and the latency it took. Replay returns the
+    recorded responses in order, either instantly (speed=None) or sleeping
+    for the recorded latency divided by speed.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", speed: Optional[float] = None,
+                 strict: bool = True):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported transport mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self.strict = strict
+        self.requests = 0
+        self.network_seconds = 0.0
+        self._lock = threading.Lock()
+        self._file = None
+        self._recorded: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._last: Dict[str, Dict] = {}
+        if mode == "record":
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        else:
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._recorded[record["k"]].append(record)
+
+    @staticmethod
+    def request_key(source: str, prompt: str) -> str:
+        return hashlib.sha256(f"{source}\0{prompt}".encode("utf-8")).hexdigest()[:32]
+
+    def send(self, source: str, prompt: str, complete: Callable[[str], str],
+             replay_key: Optional[str] = None) -> str:
+        """Perform (record) or look up (replay) one provider request.
+
+        Requests are matched on replay_key when given, else on the prompt.
+        """
+        key = self.request_key(source, replay_key if replay_key is not None else prompt)
+        if self.mode == "record":
+            start = time.monotonic()
+            response = complete(prompt)
+            latency = time.monotonic() - start
+            with self._lock:
+                self._file.write(json.dumps({"k": key, "r": response, "t": round(latency, 4)},
+                                            separators=(",", ":")) + "\n")
+                self.requests += 1
+                self.network_seconds += latency
+            return response
+
+        with self._lock:
+            queue = self._recorded.get(key)
+            if queue:
+                record = queue.popleft()
+                self._last[key] = record
+            elif key in self._last:
+                # Asked more often than recorded: repeat the last answer
+                record = self._last[key]
+            elif self.strict:
+                raise ReplayMiss(f"No recorded response for {source} request {key}")
+            else:
+                record = None
+            self.requests += 1
+            if record is not None:
+                self.network_seconds += record["t"]
+
+        if record is None:
+            return complete(prompt)
+        if self.speed:
+            time.sleep(record["t"] / self.speed)
+        return record["r"]
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, "requests": self.requests,
+                "network_seconds": round(self.network_seconds, 3)}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def transport_from_env() -> Optional[FixtureTransport]:
+    """Transport configured by FILE_ORGANIZER_RECORD / FILE_ORGANIZER_REPLAY.
+
+    FILE_ORGANIZER_REPLAY_SPEED sets replay timing (1 = recorded latency,
+    unset = instant).
+    """
+    if os.environ.get("FILE_ORGANIZER_RECORD"):
+        return FixtureTransport(os.environ["FILE_ORGANIZER_RECORD"], mode="record")
+    if os.environ.get("FILE_ORGANIZER_REPLAY"):
+        speed = os.environ.get("FILE_ORGANIZER_REPLAY_SPEED")
+        return FixtureTransport(os.environ["FILE_ORGANIZER_REPLAY"], mode="replay",
+                                speed=float(speed) if speed else None)
+    return None